@@ -0,0 +1,216 @@
+import os
+import threading
+
+from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool, VisitWebpageTool, ToolCallingAgent
+from smolagents import OpenAIServerModel, tool
+from smolagents.utils import encode_image_base64, make_image_url
+from PIL import Image
+
+from cache import cached_search_tool, cached_visit_tool
+from checks import VerdictCache, validate_map_figure
+from extract import ExtractPageRecordsTool
+from fanout import HostRateLimiter, RateLimitedTool, research_destinations
+from tools import (
+    calculate_relocation_costs,
+    calculate_relocation_cost_matrix,
+    calculate_relocation_costs_from_market_data,
+    find_candidate_towns,
+    geocode_places,
+    save_maps,
+    simulate_relocation_cost_ranges,
+)
+
+AUTHORIZED_IMPORTS = [
+    "geopandas",
+    "plotly",
+    "shapely",
+    "json",
+    "pandas",
+    "numpy",
+    "requests"
+]
+
+
+class RelocationAgents:
+    """
+    Models, tools and agents for relocation queries, built once and reused across queries.
+
+    Model clients, the cached web tools and the verdict cache are shared. Agents keep per-run memory,
+    so every thread gets its own manager agent (and research fans out to fresh web agents).
+    """
+
+    def __init__(self, tracer=None):
+        #connect to hugging face
+        from huggingface_hub import login; login(os.environ['HF_TOKEN'])
+
+        self.model = HfApiModel(
+            "Qwen/Qwen2.5-Coder-32B-Instruct", max_tokens=8096
+        )
+        #self.manager_model = HfApiModel("deepseek-ai/DeepSeek-R1", max_tokens=8096)
+        self.manager_model = HfApiModel("meta-llama/Llama-3.3-70B-Instruct")
+        self.multimodal_model = OpenAIServerModel("gpt-4o", max_tokens=8096)
+        self.verdicts = VerdictCache()
+
+        #cached on disk (set RELOC_REPLAY=1 to run from the cache only) and rate limited per host,
+        #shared by every web_agent so parallel research does not hammer the same site
+        self.rate_limiter = HostRateLimiter(min_interval=1.0)
+        self.tracer = tracer
+        self.web_tools = self._traced([
+            cached_search_tool(RateLimitedTool(DuckDuckGoSearchTool(), self.rate_limiter)),
+            #compact records parsed locally, the full page text is the fallback
+            ExtractPageRecordsTool(limiter=self.rate_limiter),
+            cached_visit_tool(RateLimitedTool(VisitWebpageTool(), self.rate_limiter)),
+            calculate_relocation_costs,
+            calculate_relocation_cost_matrix,
+        ])
+        self.manager_tools = self._traced([
+            calculate_relocation_costs,
+            calculate_relocation_cost_matrix,
+            calculate_relocation_costs_from_market_data,
+            find_candidate_towns,
+            geocode_places,
+            simulate_relocation_cost_ranges,
+            self._make_research_tool(),
+            save_maps,
+        ])
+        self.step_callbacks = tracer.step_callbacks() if tracer is not None else []
+        self._local = threading.local()
+
+    def _traced(self, tools):
+        return tools if self.tracer is None else [self.tracer.traced_tool(tool) for tool in tools]
+
+    def _instrumented(self, agent):
+        return agent if self.tracer is None else self.tracer.instrument(agent)
+
+    def make_web_agent(self):
+        return self._instrumented(ToolCallingAgent(
+            model=self.model,
+            tools=self.web_tools,
+            name="web_agent",
+            description="Browses the web to find information",
+            verbosity_level=0,
+            max_steps=10,
+            step_callbacks=self.step_callbacks,
+        ))
+
+    def _make_research_tool(self):
+        make_web_agent = self.make_web_agent
+
+        @tool
+        def research_destinations_in_parallel(
+            origin: str,
+            destinations: list,
+            origin_sqft: int = 2000,
+            dest_sqft: int = 3000,
+        ) -> list:
+            """
+            Research many destinations at the same time, one web browsing agent per destination.
+            Much faster than asking web_agent about destinations one after another.
+
+            Args:
+                origin: origin metro, e.g. "Sonoma, CA"
+                destinations: destination metros, e.g. ["Asheville, NC", "Durham, NC"]
+                origin_sqft: house size at the origin used for moving quotes
+                dest_sqft: house size at the destinations used for median sales prices
+
+            Returns:
+                list: one dict per destination with destination, status ("ok", "error" or "timeout"), error, elapsed,
+                median_sales_price, house_size, moving_cost_low, moving_cost_high and sources
+            """
+            table = research_destinations(
+                destinations,
+                make_web_agent,
+                origin,
+                origin_sqft=origin_sqft,
+                dest_sqft=dest_sqft,
+                max_workers=int(os.environ.get("RELOC_RESEARCH_WORKERS", 4)),
+                timeout=float(os.environ.get("RELOC_RESEARCH_TIMEOUT", 300)),
+            )
+            return table.astype(object).where(table.notna(), None).to_dict("records")
+
+        return research_destinations_in_parallel
+
+    def make_plot_check(self, filepath="saved_map.png", expected_points=None):
+        """
+        Final answer check: structural checks on the figure, then a (cached) multimodal review of the saved map.
+        With expected_points (the query's count), the map must show that many locations, plus the origin at most.
+        """
+        multimodal_model, verdicts = self.multimodal_model, self.verdicts
+        point_range = {} if expected_points is None else dict(min_points=expected_points, max_points=expected_points + 1)
+
+        def check_reasoning_and_plot(final_answer, agent_memory, **kwargs):
+            #structural checks first, only figures that pass them are worth a multimodal review
+            problems = validate_map_figure(final_answer, **point_range)
+            if problems:
+                raise Exception("FAIL: " + " ".join(problems))
+            assert os.path.exists(filepath), f"Make sure to save the plot under {filepath}!"
+            with open(filepath, "rb") as f:
+                image_bytes = f.read()
+            steps = agent_memory.get_succinct_steps()
+            output = verdicts.get(image_bytes, steps)
+            if output is not None:
+                print("Feedback (cached): ", output)
+                if "FAIL" in output:
+                    raise Exception(output)
+                return True
+            image = Image.open(filepath)
+            prompt = (
+                f"Here is a user-given task and the agent steps: {steps}. Now here is the plot that was made."
+                "Please check that the reasoning process and plot are correct: do they correctly answer the given task?"
+                "First list reasons why yes/no, then write your final decision: PASS in caps lock if it is satisfactory, FAIL if it is not."
+                "Don't be harsh: if the plot mostly solves the task, it should pass."
+                "To pass, a plot should be made using px.scatter_map and not any other method (scatter_map looks nicer)."
+            )
+            messages = [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt,
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": make_image_url(encode_image_base64(image))},
+                        },
+                    ],
+                }
+            ]
+            output = multimodal_model(messages).content
+            verdicts.set(image_bytes, steps, output)
+            print("Feedback: ", output)
+            if "FAIL" in output:
+                raise Exception(output)
+            return True
+
+        if self.tracer is not None:
+            return self.tracer.traced(check_reasoning_and_plot)
+        return check_reasoning_and_plot
+
+    def make_manager_agent(self, verbosity_level=2):
+        return self._instrumented(CodeAgent(
+            model=self.manager_model,
+            tools=self.manager_tools,
+            managed_agents=[self.make_web_agent()],
+            additional_authorized_imports=AUTHORIZED_IMPORTS,
+            planning_interval=5,
+            verbosity_level=verbosity_level,
+            final_answer_checks=[self.make_plot_check()],
+            max_steps=15,
+            step_callbacks=self.step_callbacks,
+        ))
+
+    def manager_agent(self):
+        """This thread's manager agent, created on first use and reused afterwards."""
+        if not hasattr(self._local, "manager_agent"):
+            self._local.manager_agent = self.make_manager_agent()
+        return self._local.manager_agent
+
+    def run(self, task, map_path="saved_map.png", expected_points=None):
+        """Run one task on this thread's manager agent, checking the map saved under map_path."""
+        agent = self.manager_agent()
+        agent.final_answer_checks = [self.make_plot_check(map_path, expected_points)]
+        if self.tracer is None:
+            return agent.run(task, reset=True)
+        with self.tracer.run(task, map_path=map_path):
+            return agent.run(task, reset=True)
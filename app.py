@@ -1,139 +1,31 @@
-# We first make a tool to get the cargo plane transfer time.
-from smolagents import tool
-from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool, VisitWebpageTool, ToolCallingAgent
-
+"""
+Relocation cost agent.
+
+    python app.py run                        # the default North Carolina query, once
+    python app.py run --query '{"region": "Florida", "origin": "Napa, CA"}'
+    python app.py serve --stdin --workers 4  # one JSON query per line in, one JSON result per line out
+    python app.py serve --http 127.0.0.1:8080 --workers 4   # POST /query, GET /health
+
+Heavy imports (smolagents, PIL, the tool stack) happen when the agents are first built, so importing
+this module is cheap and a server pays the cold start once. In serve mode, queries without a "map_path"
+get their own under RELOC_MAP_DIR (default "maps"), so concurrent queries never share a map file.
+"""
+import argparse
+import json
 import os
-
-@tool
-def calculate_relocation_costs(
-    median_sales_price_origin: float,
-    median_sales_price_dest: float,
-    estimated_moving_costs: float,  # Average speed for cargo planes
-) -> float:
-    """
-    Calculate relocation costs from a given location to new destination.  
-
-    Args:
-        median_sales_price_origin: sales price of current home
-        median_sales_price_dest: sales price at new location or destination. 
-        estimated_moving_costs: estimated moving costs for average sized house at median price
-
-    Returns:
-        float: The total relocation cost 
-
-    Example:
-        >>> # median sales price in San Francisco is $1,300,000, median sales price in Chapel Hill is $530,000,
-        >>> estimated_moving_costs (full service) are $10,950, and payoff loan amount is $100,000
-        >>> result = calculate_relocation_cost(1300000.00, 530000.00, 10950.00, 100000.000)
-    """
-
-    #additional parameters
-    prep_cost = 10000.00
-    percent_sale_comission = 0.05
-    percent_closing_cost = 0.02
-    payoff_loan_amount = 100000
-    
-    #calculate comissions
-    sale_comission = percent_sale_comission * median_sales_price_origin
-    closing_cost =  percent_closing_cost * median_sales_price_dest
-    
-    #net proceeds from sale of house
-    net_proceeds = median_sales_price_origin - (sale_comission + prep_cost + payoff_loan_amount) 
-    
-    #remainder after purchase of new home
-    sale_surplus = net_proceeds - (median_sales_price_dest + closing_cost) 
-
-    #relocation cost 
-    reloc_cost = estimated_moving_costs - sale_surplus
-    return round(reloc_cost, 2)
-
-#connect to hugging face
-from huggingface_hub import login; login(os.environ['HF_TOKEN'])
-
-model = HfApiModel(
-    "Qwen/Qwen2.5-Coder-32B-Instruct", max_tokens=8096
-) 
-
-web_agent = ToolCallingAgent(
-    model=model,
-    tools=[
-        DuckDuckGoSearchTool(),
-        VisitWebpageTool(),
-        calculate_relocation_costs,
-    ],
-    name="web_agent",
-    description="Browses the web to find information",
-    verbosity_level=0,
-    max_steps=10,
-)
-
-from smolagents.utils import encode_image_base64, make_image_url
-from smolagents import OpenAIServerModel
-import os
-from PIL import Image
-
-def check_reasoning_and_plot(final_answer, agent_memory):
-    final_answer
-    multimodal_model = OpenAIServerModel("gpt-4o", max_tokens=8096)
-    filepath = "saved_map.png"
-    assert os.path.exists(filepath), "Make sure to save the plot under saved_map.png!"
-    image = Image.open(filepath)
-    prompt = (
-        f"Here is a user-given task and the agent steps: {agent_memory.get_succinct_steps()}. Now here is the plot that was made."
-        "Please check that the reasoning process and plot are correct: do they correctly answer the given task?"
-        "First list reasons why yes/no, then write your final decision: PASS in caps lock if it is satisfactory, FAIL if it is not."
-        "Don't be harsh: if the plot mostly solves the task, it should pass."
-        "To pass, a plot should be made using px.scatter_map and not any other method (scatter_map looks nicer)."
-    )
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": prompt,
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": make_image_url(encode_image_base64(image))},
-                },
-            ],
-        }
-    ]
-    output = multimodal_model(messages).content
-    print("Feedback: ", output)
-    if "FAIL" in output:
-        raise Exception(output)
-    return True
-
-
-manager_agent = CodeAgent(
-    #model=HfApiModel("deepseek-ai/DeepSeek-R1", max_tokens=8096),
-    model=HfApiModel("meta-llama/Llama-3.3-70B-Instruct"),
-    #model = HfApiModel("Qwen/Qwen2.5-Coder-32B-Instruct", max_tokens=8096),
-    tools=[calculate_relocation_costs],
-    managed_agents=[web_agent],
-    additional_authorized_imports=[
-        "geopandas",
-        "plotly",
-        "shapely",
-        "json",
-        "pandas",
-        "numpy",
-        "requests"
-    ],
-    planning_interval=5,
-    verbosity_level=2,
-    final_answer_checks=[check_reasoning_and_plot],
-    max_steps=15,
-)
-
-manager_agent.run("""
-Find the ten best locations to retire in North Carolina and calculate the relocation costs for Sonoma, CA, (38.2919° N, 122.4580° W).
-Consider median sales prices for a 2000 sqf house at origin and median sales prices for a 3000 sqf house at the destination locations. 
-Provide full-service moving costs for a 2000 sqf house at the origin. 
-Represent this as a spatial map of the world, with the locations represented as scatter points with a color that depends on the relocation cost, 
-and save it to saved_map_2.png!
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+TASK = """
+Find the {count} best locations to retire in {region} and calculate the relocation costs for {origin}{origin_coords}.
+Consider median sales prices for a {origin_sqft} sqf house at origin and median sales prices for a {dest_sqft} sqf house at the destination locations.
+Provide full-service moving costs for a {origin_sqft} sqf house at the origin.
+Represent this as a spatial map of the world, with the locations represented as scatter points with a color that depends on the relocation cost,
+and save it to {map_path}!
 
 Here's an example of how to plot and return a map:
 import plotly.express as px
@@ -141,8 +33,176 @@ df = px.data.carshare()
 fig = px.scatter_map(df, lat="centroid_lat", lon="centroid_lon", text="name", color="peak_hour", size=100,
      color_continuous_scale=px.colors.sequential.Magma, size_max=15, zoom=1)
 fig.show()
-fig.write_image("saved_image_2.png")
+save_maps([fig], ["{map_path}"])
 final_answer(fig)
 
 Never try to process strings using code: when you have a string to read, just print it and you'll see it.
-""")
\ No newline at end of file
+"""
+
+DEFAULT_QUERY = {
+    "origin": "Sonoma, CA",
+    "origin_lat": 38.2919,
+    "origin_lon": -122.4580,
+    "region": "North Carolina",
+    "count": 10,
+    "origin_sqft": 2000,
+    "dest_sqft": 3000,
+    "map_path": "saved_map.png",
+}
+
+MAP_DIR = os.environ.get("RELOC_MAP_DIR", "maps")
+
+_agents = None
+_agents_lock = threading.Lock()
+
+
+def get_agents():
+    """Build the models, tools and agents on first call and keep them for the life of the process."""
+    global _agents
+    with _agents_lock:
+        if _agents is None:
+            from agents import RelocationAgents
+            from tracing import Tracer
+
+            _agents = RelocationAgents(tracer=Tracer.from_env())
+    return _agents
+
+
+def build_task(query):
+    """Task prompt for a query (a dict overriding DEFAULT_QUERY). Raises ValueError on invalid queries."""
+    if not isinstance(query, dict):
+        raise ValueError(f"A query must be a JSON object, got {type(query).__name__}")
+    query = {**DEFAULT_QUERY, **query}
+    origin_coords = ""
+    if query.get("origin_lat") is not None and query.get("origin_lon") is not None:
+        try:
+            lat, lon = float(query["origin_lat"]), float(query["origin_lon"])
+        except (TypeError, ValueError):
+            raise ValueError("origin_lat and origin_lon must be numbers") from None
+        origin_coords = f", ({abs(lat):.4f}° {'N' if lat >= 0 else 'S'}, {abs(lon):.4f}° {'E' if lon >= 0 else 'W'})"
+    try:
+        query["count"] = int(query["count"])
+    except (TypeError, ValueError):
+        raise ValueError("count must be an integer") from None
+    if query["count"] < 1:
+        raise ValueError("count must be at least 1")
+    #origin_coords is derived from origin_lat/origin_lon, never taken from the query
+    return TASK.format(**{**query, "origin_coords": origin_coords}), query
+
+
+def unique_map_path(query_id=None):
+    """Fresh map path under MAP_DIR, tagged with the query id when there is one."""
+    os.makedirs(MAP_DIR, exist_ok=True)
+    tag = re.sub(r"[^A-Za-z0-9_-]+", "_", str(query_id))[:40] + "_" if query_id is not None else ""
+    return os.path.join(MAP_DIR, f"map_{tag}{uuid.uuid4().hex[:12]}.png")
+
+
+def run_query(query, unique_map=False):
+    """
+    Run one relocation query and return a JSON serialisable result, with status "error" for invalid queries.
+    With unique_map, a query without its own "map_path" gets a fresh one instead of the shared default.
+    """
+    started = time.time()
+    result = {"id": query.get("id") if isinstance(query, dict) else None}
+    try:
+        if unique_map and isinstance(query, dict) and "map_path" not in query:
+            query = {**query, "map_path": unique_map_path(query.get("id"))}
+        task, query = build_task(query)
+        result["map_path"] = query["map_path"]
+        answer = get_agents().run(task, map_path=query["map_path"], expected_points=query["count"])
+        result["status"] = "ok"
+        #the answer is normally the plotly figure, which is saved under map_path
+        result["answer"] = None if hasattr(answer, "to_plotly_json") else str(answer)
+    except Exception as e:
+        result["status"], result["error"] = "error", str(e)
+    result["elapsed"] = round(time.time() - started, 2)
+    return result
+
+
+def serve_stdin(executor):
+    """Read one JSON query per line from stdin and write one JSON result per line as each finishes."""
+    write_lock = threading.Lock()
+
+    def write(future):
+        with write_lock:
+            print(json.dumps(future.result()), flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            query = json.loads(line)
+        except json.JSONDecodeError as e:
+            with write_lock:
+                print(json.dumps({"status": "error", "error": f"Invalid JSON: {e}"}), flush=True)
+            continue
+        executor.submit(run_query, query, unique_map=True).add_done_callback(write)
+
+
+def serve_http(executor, address):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {"status": "ok", "agents_loaded": _agents is not None})
+
+        def do_POST(self):
+            if self.path != "/query":
+                return self._reply(404, {"error": "not found"})
+            try:
+                query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except json.JSONDecodeError as e:
+                return self._reply(400, {"error": f"Invalid JSON: {e}"})
+            #queries run on the bounded worker pool, the handler thread just waits for the result
+            self._reply(200, executor.submit(run_query, query, unique_map=True).result())
+
+    host, _, port = address.rpartition(":")
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+    print(f"Serving relocation queries on http://{host or '127.0.0.1'}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relocation cost agent")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="run a single query and exit")
+    run.add_argument("--query", default="{}", help="JSON query overriding the default North Carolina query")
+    serve = commands.add_parser("serve", help="keep the agents warm and answer queries")
+    mode = serve.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--stdin", action="store_true", help="read JSONL queries from stdin")
+    mode.add_argument("--http", metavar="HOST:PORT", help="serve POST /query on this address")
+    serve.add_argument("--workers", type=int, default=int(os.environ.get("RELOC_WORKERS", 2)),
+                       help="number of queries run concurrently")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        get_agents()
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="query") as executor:
+            if args.stdin:
+                serve_stdin(executor)
+            else:
+                serve_http(executor, args.http)
+        return
+
+    query = json.loads(args.query) if args.command == "run" else {}
+    result = run_query(query)
+    print(json.dumps(result))
+    if result["status"] != "ok":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark harness for agent runs.
+
+Replays a fixed suite of relocation tasks against a local stub model that answers with scripted code,
+so runs exercise the agent loop, the local tools and tracing without any network or LLM. Reports
+latency and token percentiles and, given a baseline from an earlier run, flags regressions.
+
+    python bench.py --repeats 20 --output bench.json
+    python bench.py --repeats 20 --baseline bench.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from smolagents import CodeAgent, Model
+from smolagents.models import ChatMessage
+
+from tools import (
+    calculate_relocation_cost_matrix,
+    calculate_relocation_costs_from_market_data,
+    find_candidate_towns,
+)
+from tracing import Tracer
+
+#each task is the list of code actions the stub model emits, one per step
+SUITE = {
+    "market_data_lookup": [
+        'costs = calculate_relocation_costs_from_market_data("Sonoma, CA", ["Durham, NC", "Madison, WI", "Tampa, FL"])\n'
+        "print(costs)",
+        "final_answer(costs)",
+    ],
+    "candidate_discovery": [
+        'towns = find_candidate_towns(35.5951, -82.5515, radius_km=150, state="NC")\nprint(len(towns))',
+        'costs = calculate_relocation_costs_from_market_data("Sonoma, CA", [town["name"] for town in towns])\n'
+        "print(costs)",
+        "final_answer(costs)",
+    ],
+    "cost_matrix": [
+        "costs = calculate_relocation_cost_matrix([894854.25, 1300000.0], [513750.0, 422111.0, 436542.67], "
+        "[[4220.0, 4340.0, 4105.0], [10950.0, 9800.0, 10100.0]])\nprint(costs)",
+        "final_answer(costs)",
+    ],
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+class StubModel(Model):
+    """Scripted stand-in for the LLM: returns the next code action of a task, with an optional fixed delay."""
+
+    def __init__(self, actions, delay=0.0):
+        super().__init__(model_id="stub")
+        self.actions = actions
+        self.delay = delay
+        self.calls = 0
+        self.last_input_token_count = 0
+        self.last_output_token_count = 0
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        action = self.actions[min(self.calls, len(self.actions) - 1)]
+        self.calls += 1
+        content = f"Thought: next step.\n<code>\n{action}\n</code>"
+        #rough token counts (4 characters per token) so token accounting has something to add up
+        self.last_input_token_count = sum(len(str(message)) for message in messages) // 4
+        self.last_output_token_count = len(content) // 4
+        message = ChatMessage(role="assistant", content=content)
+        try:
+            from smolagents.monitoring import TokenUsage
+
+            message.token_usage = TokenUsage(self.last_input_token_count, self.last_output_token_count)
+        except ImportError:
+            pass
+        return message
+
+    __call__ = generate
+
+
+def run_suite(repeats=5, delay=0.0):
+    """Run every task in SUITE repeats times and return the tracer's "run" records."""
+    tracer = Tracer(path=None)
+    tools = [
+        tracer.traced_tool(tool)
+        for tool in (calculate_relocation_cost_matrix, calculate_relocation_costs_from_market_data, find_candidate_towns)
+    ]
+    for _ in range(repeats):
+        for name, actions in SUITE.items():
+            agent = tracer.instrument(CodeAgent(
+                model=StubModel(actions, delay=delay),
+                tools=tools,
+                step_callbacks=tracer.step_callbacks(),
+                verbosity_level=0,
+                max_steps=len(actions) + 1,
+            ))
+            with tracer.run(name, task_name=name):
+                agent.run(name)
+    return tracer.records
+
+
+def summarize(records):
+    """Latency and token percentiles per task and over the whole suite."""
+    runs = [record for record in records if record["kind"] == "run"]
+    groups = {"all": runs}
+    for run in runs:
+        groups.setdefault(run["task_name"], []).append(run)
+    summary = {}
+    for name, group in groups.items():
+        stats = {
+            "runs": len(group),
+            "errors": sum(run["errors"] for run in group),
+            "retries": sum(run["step_retries"] + run["tool_repeats"] for run in group),
+        }
+        for metric in ("duration", "input_tokens", "output_tokens", "steps"):
+            values = np.array([run[metric] for run in group], dtype=float)
+            for p in PERCENTILES:
+                stats[f"{metric}_p{p}"] = round(float(np.percentile(values, p)), 4)
+        summary[name] = stats
+    tools = [record for record in records if record["kind"] == "tool"]
+    for tool in sorted({record["tool"] for record in tools}):
+        durations = [record["duration"] for record in tools if record["tool"] == tool]
+        summary.setdefault("tools", {})[tool] = {
+            "calls": len(durations),
+            **{f"duration_p{p}": round(float(np.percentile(durations, p)), 4) for p in PERCENTILES},
+        }
+    return summary
+
+
+#counts where any increase is a regression, whatever the tolerance
+STRICT_METRICS = ("errors", "retries")
+#totals that grow with --repeats, compared per run so baselines from different repeat counts line up
+PER_RUN_METRICS = ("errors", "retries", "calls")
+
+
+def _groups(summary):
+    """(name, stats, runs) for every task group and every tool; tools are counted against all runs."""
+    all_runs = summary.get("all", {}).get("runs", 0)
+    for name, stats in summary.items():
+        if name != "tools":
+            yield name, stats, stats.get("runs", 0)
+    for tool, stats in summary.get("tools", {}).items():
+        yield f"tools.{tool}", stats, all_runs
+
+
+def regressions(summary, baseline, tolerance=0.2):
+    """
+    Metrics that grew more than tolerance (relative) over the baseline summary, per task and per tool.
+    Errors, retries and tool calls are compared per run. Errors and retries regress on any increase,
+    and any metric with a zero baseline regresses when it becomes positive.
+    """
+    before_groups = {name: (stats, runs) for name, stats, runs in _groups(baseline)}
+    found = []
+    for name, stats, runs in _groups(summary):
+        if name not in before_groups:
+            continue
+        before_stats, before_runs = before_groups[name]
+        for metric, value in stats.items():
+            before = before_stats.get(metric)
+            if metric == "runs" or before is None:
+                continue
+            label = metric
+            if metric in PER_RUN_METRICS:
+                label = f"{metric}_per_run"
+                value, before = round(value / max(runs, 1), 4), round(before / max(before_runs, 1), 4)
+            limit = before if metric in STRICT_METRICS or before == 0 else before * (1 + tolerance)
+            if value > limit:
+                found.append(f"{name}.{label}: {before} -> {value}")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark agent runs against a stub model")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated model latency per call, in seconds")
+    parser.add_argument("--output", help="write the summary to this JSON file")
+    parser.add_argument("--baseline", help="summary JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative growth before a regression")
+    args = parser.parse_args(argv)
+
+    summary = summarize(run_suite(args.repeats, args.delay))
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(summary, json.load(f), args.tolerance)
+        for line in found:
+            print("REGRESSION", line, file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
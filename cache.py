@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from smolagents import Tool
+
+CACHE_DIR = os.environ.get("RELOC_CACHE_DIR", ".reloc_cache")
+CACHE_TTL = float(os.environ.get("RELOC_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get("RELOC_CACHE_MAX_ENTRIES", 5000))
+REPLAY = os.environ.get("RELOC_REPLAY", "") not in ("", "0", "false", "False")
+
+_MISS = object()
+
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a request is not in the cache."""
+
+
+def normalize_query(query):
+    """Lower-case a search query and collapse whitespace so trivial variations share an entry."""
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+
+def normalize_url(url):
+    """Canonical form of a URL: lower-case scheme/host, no fragment, sorted query, no trailing slash."""
+    parts = urlsplit(str(url).strip())
+    scheme = (parts.scheme or "https").lower()
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class DiskCache:
+    """
+    Small on-disk key/value cache backed by sqlite, with a TTL, an LRU entry cap and
+    hit/miss counters. Values must be JSON serialisable. Safe to share between threads.
+
+    Args:
+        path: sqlite file, created if missing
+        namespace: prefix separating independent users of the same file
+        ttl: seconds an entry stays fresh, None to keep forever
+        max_entries: LRU cap on the number of entries in this namespace, None for no cap
+    """
+
+    def __init__(self, path=None, namespace="default", ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "cache.sqlite")
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT, key TEXT, value TEXT, created REAL, accessed REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key, default=None, ignore_ttl=False):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None or (not ignore_ttl and self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return default
+            self._db.execute(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, self.namespace, key)
+            )
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), now, now),
+            )
+            if self.max_entries is not None:
+                #evict least recently used entries beyond the cap
+                self._db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM entries WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class CachedTool(Tool):
+    """
+    Wraps a smolagents tool (e.g. DuckDuckGoSearchTool, VisitWebpageTool) with a DiskCache.
+    The wrapper exposes the same name, description and inputs, so agents cannot tell the difference.
+
+    Args:
+        tool: the tool to wrap
+        cache: DiskCache to use, a per-tool namespace in the default file if None
+        normalizers: optional {input name: function} applied to inputs before building the key
+        replay: serve only from the cache (ignoring TTL) and raise CacheMissError on a miss
+        cacheable: optional predicate on a result, results it rejects (e.g. error messages) are not stored
+    """
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool, cache=None, normalizers=None, replay=REPLAY, cacheable=None):
+        self.tool = tool
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        self.cache = cache if cache is not None else DiskCache(namespace=tool.name)
+        self.normalizers = normalizers or {}
+        self.replay = replay
+        self.cacheable = cacheable
+        super().__init__()
+
+    def forward(self, *args, **kwargs):
+        kwargs.update(zip(self.inputs, args))
+        key = self.cache.make_key(
+            self.name,
+            {name: self.normalizers.get(name, lambda value: value)(value) for name, value in kwargs.items()},
+        )
+        value = self.cache.get(key, _MISS, ignore_ttl=self.replay)
+        if value is not _MISS:
+            return value
+        if self.replay:
+            raise CacheMissError(f"{self.name}({kwargs}) is not in the cache and replay mode is on")
+        value = self.tool(**kwargs)
+        if self.cacheable is None or self.cacheable(value):
+            self.cache.set(key, value)
+        return value
+
+
+def cached_search_tool(tool, **kwargs):
+    return CachedTool(tool, normalizers={"query": normalize_query}, **kwargs)
+
+
+#VisitWebpageTool returns these messages instead of raising on timeouts, HTTP errors (429, 5xx, ...) and other failures
+VISIT_ERROR_PREFIXES = (
+    "The request timed out",
+    "Error fetching the webpage:",
+    "An unexpected error occurred:",
+)
+
+
+def visit_succeeded(page):
+    return not (isinstance(page, str) and page.startswith(VISIT_ERROR_PREFIXES))
+
+
+def cached_visit_tool(tool, **kwargs):
+    return CachedTool(tool, normalizers={"url": normalize_url}, cacheable=visit_succeeded, **kwargs)
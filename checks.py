@@ -0,0 +1,94 @@
+import hashlib
+import json
+
+import numpy as np
+
+from cache import DiskCache
+
+MAP_TRACE_TYPE = "scattermap"
+
+
+def validate_map_figure(fig, min_points=2, max_points=None):
+    """
+    Cheap structural checks on the figure an agent returned, run before any multimodal review.
+
+    Checks that every trace is a px.scatter_map trace, that latitudes and longitudes are present and in range,
+    that the marker color is bound to a numeric column (the relocation cost) and the number of points.
+
+    Returns:
+        list: problems found, empty if the figure looks right
+    """
+    data = getattr(fig, "data", None)
+    if data is None:
+        return [f"The final answer should be the plotly figure, got {type(fig).__name__}"]
+    if not data:
+        return ["The figure has no traces"]
+
+    problems = []
+    points = 0
+    for i, trace in enumerate(data):
+        if trace.type != MAP_TRACE_TYPE:
+            problems.append(f"Trace {i} is {trace.type}, the map must be made with px.scatter_map")
+            continue
+        lat = np.asarray(trace.lat if trace.lat is not None else [], dtype=float)
+        lon = np.asarray(trace.lon if trace.lon is not None else [], dtype=float)
+        if lat.shape != lon.shape:
+            problems.append(f"Trace {i} has {lat.size} latitudes but {lon.size} longitudes")
+            continue
+        if not np.all(np.isfinite(lat)) or not np.all(np.isfinite(lon)):
+            problems.append(f"Trace {i} has missing coordinates")
+        elif np.any(np.abs(lat) > 90) or np.any(np.abs(lon) > 180):
+            problems.append(f"Trace {i} has coordinates out of range, are lat and lon swapped?")
+        color = trace.marker.color
+        if color is None or isinstance(color, str) or np.ndim(color) != 1 or len(color) != lat.size:
+            problems.append(f"Trace {i} colors are not bound to a column, pass color=\"relocation_cost\"")
+        else:
+            try:
+                np.asarray(color, dtype=float)
+            except (TypeError, ValueError):
+                problems.append(f"Trace {i} colors are not numeric relocation costs")
+        points += lat.size
+
+    if points < min_points:
+        problems.append(f"The map shows {points} points, expected at least {min_points}")
+    if max_points is not None and points > max_points:
+        problems.append(f"The map shows {points} points, expected at most {max_points}")
+    return problems
+
+
+class VerdictCache:
+    """
+    Remembers multimodal review verdicts by image hash and a digest of the agent steps,
+    so re-checking an identical plot with identical reasoning does not call the model again.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else DiskCache(namespace="verdicts", ttl=None)
+
+    #step fields that depend only on what the agent did, not on when or at what token cost
+    STEP_FIELDS = ("task", "plan", "model_output", "code_action", "observations", "error")
+
+    @classmethod
+    def steps_digest(cls, steps):
+        content = []
+        for step in steps:
+            kept = {field: step[field] for field in cls.STEP_FIELDS if step.get(field) is not None}
+            #tool call ids can be random, the name and arguments are what matter
+            if step.get("tool_calls"):
+                kept["tool_calls"] = [
+                    {"name": call["function"]["name"], "arguments": call["function"]["arguments"]}
+                    for call in step["tool_calls"]
+                ]
+            content.append(kept)
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def key(cls, image_bytes, steps):
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        return f"{image_hash}:{cls.steps_digest(steps)}"
+
+    def get(self, image_bytes, steps):
+        return self.cache.get(self.key(image_bytes, steps))
+
+    def set(self, image_bytes, steps, verdict):
+        self.cache.set(self.key(image_bytes, steps), verdict)
@@ -0,0 +1,200 @@
+import atexit
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from smolagents import Tool
+
+from cache import REPLAY, CacheMissError, DiskCache, normalize_url
+
+MAX_PAGE_BYTES = 5_000_000
+FETCH_TIMEOUT = 20
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+#characters of context kept around each extracted value so the agent can sanity check it
+CONTEXT_CHARS = 60
+
+_AMOUNT = r"\$\s?(\d[\d,]*(?:\.\d+)?)\s?([KkMm](?![a-z]))?"
+#per square foot wording between the label and the amount, or right after the amount, marks a price per sq ft
+_PER_SQFT = r"(?:per\s*sq|per\s+square|/\s*sq|psf\b)"
+_MEDIAN_PRICE = re.compile(
+    r"median\s+(?:home\s+|house\s+)?(?:sale|sales|sold|listing|list|home)?\s*price"
+    r"(?:(?!" + _PER_SQFT + r")[^$]){0,80}?" + _AMOUNT + r"(?!,?\d|\s*" + _PER_SQFT + r")",
+    re.I,
+)
+_SQUARE_FEET = re.compile(r"(\d{1,2},?\d{3}|\d{3,4})\s*(?:sq\.?\s?ft\.?|sqft|square\s+f(?:ee|oo)t)", re.I)
+_MOVING_RANGE = re.compile(_AMOUNT + r"\s*(?:-|–|—|to)\s*" + _AMOUNT, re.I)
+_MOVING_WORDS = re.compile(r"mov(?:e|er|ers|ing)", re.I)
+
+
+class _TextExtractor(HTMLParser):
+    """Visible text of an HTML page, without scripts and styles."""
+
+    _SKIP = {"script", "style", "noscript", "svg", "head"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def page_text(html):
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return re.sub(r"\s+", " ", " ".join(parser.parts)).strip()
+
+
+def _amount(number, suffix):
+    value = float(number.replace(",", ""))
+    return value * {"k": 1e3, "m": 1e6}.get((suffix or "").lower(), 1)
+
+
+def _context(text, match):
+    start, end = max(match.start() - CONTEXT_CHARS, 0), min(match.end() + CONTEXT_CHARS, len(text))
+    return text[start:end]
+
+
+def extract_records(html, url):
+    """
+    Compact record of the relocation figures found in one page: median sale price, square footage,
+    moving cost range and a short context snippet for each. Runs in worker processes, so it is a plain
+    function of its arguments.
+
+    Returns:
+        dict: url, status ("found" or "not found"), median_sale_price, square_feet, moving_cost_low,
+        moving_cost_high and evidence (field -> snippet)
+    """
+    text = page_text(html)
+    record = {
+        "url": url,
+        "status": "not found",
+        "median_sale_price": None,
+        "square_feet": None,
+        "moving_cost_low": None,
+        "moving_cost_high": None,
+        "evidence": {},
+    }
+
+    match = _MEDIAN_PRICE.search(text)
+    if match:
+        record["median_sale_price"] = _amount(*match.group(1, 2))
+        record["evidence"]["median_sale_price"] = _context(text, match)
+
+    match = _SQUARE_FEET.search(text)
+    if match:
+        record["square_feet"] = float(match.group(1).replace(",", ""))
+        record["evidence"]["square_feet"] = _context(text, match)
+
+    #only dollar ranges with moving words nearby count as moving quotes
+    for match in _MOVING_RANGE.finditer(text):
+        if _MOVING_WORDS.search(_context(text, match)):
+            low, high = _amount(*match.group(1, 2)), _amount(*match.group(3, 4))
+            record["moving_cost_low"], record["moving_cost_high"] = min(low, high), max(low, high)
+            record["evidence"]["moving_cost"] = _context(text, match)
+            break
+
+    if record["evidence"]:
+        record["status"] = "found"
+    return record
+
+
+def fetch_html(url, limiter=None):
+    import requests
+
+    if limiter is not None:
+        limiter.wait(urlsplit(url).netloc.lower())
+    response = requests.get(url, timeout=FETCH_TIMEOUT, headers={"User-Agent": USER_AGENT})
+    response.raise_for_status()
+    return response.text[:MAX_PAGE_BYTES]
+
+
+class ExtractPageRecordsTool(Tool):
+    """
+    Fetches pages and extracts compact relocation records locally instead of returning the page text.
+    Fetches run on a thread pool, parsing on a process pool, and records are memoized per normalized URL
+    in the disk cache (replay mode serves them from the cache only). The pools are created once, on first
+    use, and shut down by close() or at exit.
+    """
+
+    name = "extract_page_records"
+    description = (
+        "Visits webpages and returns only the relocation figures found on each page: median sale price, "
+        "square footage and full-service moving cost range, with a short evidence snippet and the source URL. "
+        "Status is 'not found' when a page has none of them. Much shorter than visit_webpage, use it first."
+    )
+    inputs = {"urls": {"type": "array", "description": "The urls of the webpages to extract figures from."}}
+    output_type = "array"
+
+    def __init__(self, limiter=None, cache=None, max_workers=4, replay=REPLAY):
+        super().__init__()
+        self.limiter = limiter
+        self.cache = cache if cache is not None else DiskCache(namespace=self.name)
+        self.max_workers = max_workers
+        self.replay = replay
+        self._fetchers = None
+        self._parsers = None
+        self._setup_lock = threading.Lock()
+
+    def setup(self):
+        #parallel web agents share this tool, so concurrent first calls must not each create pools
+        with self._setup_lock:
+            if self.is_initialized:
+                return
+            self._fetchers = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+            #spawn, not fork: the parent already runs research, HTTP and kaleido threads
+            self._parsers = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(self.close)
+            self.is_initialized = True
+
+    def close(self):
+        with self._setup_lock:
+            if not self.is_initialized:
+                return
+            self._fetchers.shutdown(wait=False, cancel_futures=True)
+            self._parsers.shutdown(wait=True, cancel_futures=True)
+            self._fetchers = self._parsers = None
+            self.is_initialized = False
+            atexit.unregister(self.close)
+
+    def _cached(self, url):
+        return self.cache.get(normalize_url(url), ignore_ttl=self.replay)
+
+    def forward(self, urls: list) -> list:
+        records = {url: self._cached(url) for url in urls}
+        todo = [url for url, record in records.items() if record is None]
+        if todo and self.replay:
+            raise CacheMissError(f"{self.name}: {todo} not in the cache and replay mode is on")
+
+        pages = {url: self._fetchers.submit(fetch_html, url, self.limiter) for url in todo}
+        parsed = {}
+        for url, page in pages.items():
+            try:
+                parsed[url] = self._parsers.submit(extract_records, page.result(), url)
+            except Exception as e:
+                records[url] = {"url": url, "status": "error", "error": str(e)}
+        for url, future in parsed.items():
+            try:
+                records[url] = future.result()
+            except Exception as e:
+                records[url] = {"url": url, "status": "error", "error": str(e)}
+                continue
+            self.cache.set(normalize_url(url), records[url])
+        return [records[url] for url in urls]
@@ -0,0 +1,142 @@
+import contextvars
+import json
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import pandas as pd
+from smolagents import Tool
+
+#columns of the merged research table, besides destination/status/error/elapsed
+RESEARCH_FIELDS = ("median_sales_price", "house_size", "moving_cost_low", "moving_cost_high", "sources")
+
+RESEARCH_TASK = """
+Research {destination} as a relocation destination from {origin}.
+Find the median sales price for a {dest_sqft} sqf house in {destination}, the typical house size there,
+and full-service moving cost quotes for a {origin_sqft} sqf house from {origin} to {destination}.
+Answer ONLY with a JSON object with the keys "median_sales_price", "house_size", "moving_cost_low",
+"moving_cost_high" (numbers, null if not found) and "sources" (list of URLs).
+"""
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host by at least min_interval seconds, across threads.
+    Different hosts do not wait on each other.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedTool(Tool):
+    """
+    Wraps a smolagents tool so every call first waits on a HostRateLimiter. The host is taken from
+    the tool's url input when it has one (VisitWebpageTool), otherwise the tool name is used (search tools).
+    """
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool, limiter):
+        self.tool = tool
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        self.limiter = limiter
+        super().__init__()
+
+    def forward(self, *args, **kwargs):
+        kwargs.update(zip(self.inputs, args))
+        url = kwargs.get("url")
+        self.limiter.wait(urlsplit(str(url)).netloc.lower() if url else self.name)
+        return self.tool(**kwargs)
+
+
+def parse_research(result):
+    """Turn an agent answer (dict or text containing a JSON object) into a row of RESEARCH_FIELDS."""
+    if isinstance(result, str):
+        match = re.search(r"\{.*\}", result, re.DOTALL)
+        if match is None:
+            raise ValueError(f"No JSON object in answer: {result[:200]!r}")
+        result = json.loads(match.group(0))
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {type(result).__name__}")
+    return {field: result.get(field) for field in RESEARCH_FIELDS}
+
+
+def research_destinations(
+    destinations,
+    agent_factory,
+    origin,
+    origin_sqft=2000,
+    dest_sqft=3000,
+    max_workers=4,
+    timeout=300,
+    task=RESEARCH_TASK,
+):
+    """
+    Research several destinations at once, each with its own agent in a bounded thread pool.
+
+    Agents keep per-run memory, so agent_factory() is called once per destination; the tools passed to
+    those agents are shared and should be rate limited (RateLimitedTool) and cached (cache.CachedTool).
+    A destination that runs longer than timeout seconds is interrupted and reported with status "timeout".
+
+    Returns:
+        pd.DataFrame: one row per destination with destination, status, error, elapsed and RESEARCH_FIELDS
+    """
+    rows = {destination: {"destination": destination, "status": "pending"} for destination in destinations}
+    agents, started = {}, {}
+
+    def run(destination):
+        agents[destination] = agent = agent_factory()
+        started[destination] = time.monotonic()
+        answer = agent.run(
+            task.format(destination=destination, origin=origin, origin_sqft=origin_sqft, dest_sqft=dest_sqft)
+        )
+        return parse_research(answer)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research")
+    try:
+        #each task runs in a copy of the caller's context so tracing keeps the caller's run ID
+        pending = {
+            executor.submit(contextvars.copy_context().run, run, destination): destination
+            for destination in destinations
+        }
+        while pending:
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                destination = pending.pop(future)
+                row = rows[destination]
+                row["elapsed"] = round(time.monotonic() - started.get(destination, time.monotonic()), 2)
+                try:
+                    row.update(future.result())
+                    row["status"] = "ok"
+                except Exception as e:
+                    row["status"], row["error"] = "error", str(e)
+
+            #timeouts are measured from when a task starts running, not from when it was queued
+            now = time.monotonic()
+            for future, destination in list(pending.items()):
+                if destination in started and now - started[destination] > timeout:
+                    agents[destination].interrupt()
+                    future.cancel()
+                    del pending[future]
+                    rows[destination].update(status="timeout", elapsed=round(now - started[destination], 2))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    columns = ["destination", "status", "error", "elapsed", *RESEARCH_FIELDS]
+    return pd.DataFrame([rows[destination] for destination in destinations]).reindex(columns=columns)
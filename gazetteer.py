@@ -0,0 +1,136 @@
+import csv
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.spatial import cKDTree
+
+from market_data import DATA_DIR
+
+#tab separated, same columns as the Census Bureau gazetteer place files (USPS, NAME, INTPTLAT, INTPTLONG),
+#so the full national file can be dropped in with RELOC_GAZETTEER=/path/to/2023_Gaz_place_national.txt
+GAZETTEER_PATH = os.environ.get("RELOC_GAZETTEER", os.path.join(DATA_DIR, "gazetteer_places.txt"))
+EARTH_RADIUS_KM = 6371.0088
+
+_LSAD_SUFFIX = re.compile(r"\s+(city|town|village|borough|CDP|municipality|city and borough)$")
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord(distance_km):
+    """Straight-line distance on the unit sphere for a great-circle distance."""
+    return 2 * np.sin(np.asarray(distance_km) / (2 * EARTH_RADIUS_KM))
+
+
+def _great_circle(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class Gazetteer:
+    """
+    US places with a KD-tree spatial index for candidate-destination discovery.
+
+    Points are indexed as 3D unit vectors so radius and nearest-neighbour queries use true great-circle
+    distances. Query results are DataFrames with name, state, lat, lon and (where relevant) distance_km.
+
+    Example:
+        >>> places = Gazetteer.load()
+        >>> places.nearest(38.2919, -122.4580, k=3)
+        >>> places.within_radius(35.5951, -82.5515, radius_km=100, state="NC")
+    """
+
+    def __init__(self, names, states, lat, lon):
+        self.names = np.asarray(names, dtype=object)
+        self.states = np.asarray(states, dtype=object)
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self._trees = {}
+        self._by_name = None
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f, delimiter="\t")
+            reader.fieldnames = [name.strip() for name in reader.fieldnames]
+            rows = list(reader)
+        return cls(
+            names=[_LSAD_SUFFIX.sub("", row["NAME"].strip()) for row in rows],
+            states=[row["USPS"].strip().upper() for row in rows],
+            lat=[float(row["INTPTLAT"]) for row in rows],
+            lon=[float(row["INTPTLONG"]) for row in rows],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def _tree(self, state=None):
+        """KD-tree over all places, or over one state's places, built on first use."""
+        key = state.upper() if state else None
+        if key not in self._trees:
+            rows = np.arange(len(self)) if key is None else np.flatnonzero(self.states == key)
+            self._trees[key] = (cKDTree(_unit_vectors(self.lat[rows], self.lon[rows])), rows)
+        return self._trees[key]
+
+    def _frame(self, rows, distance_km=None):
+        frame = pd.DataFrame({
+            "name": [f"{name}, {state}" for name, state in zip(self.names[rows], self.states[rows])],
+            "state": self.states[rows],
+            "lat": self.lat[rows],
+            "lon": self.lon[rows],
+        })
+        if distance_km is not None:
+            frame["distance_km"] = np.round(distance_km, 1)
+            frame = frame.sort_values("distance_km", kind="stable").reset_index(drop=True)
+        return frame
+
+    def within_radius(self, lat, lon, radius_km, state=None):
+        """Places within radius_km of (lat, lon), nearest first."""
+        tree, rows = self._tree(state)
+        point = _unit_vectors([lat], [lon])[0]
+        hits = np.asarray(tree.query_ball_point(point, _chord(radius_km)), dtype=np.int64)
+        distance = _great_circle(np.linalg.norm(tree.data[hits] - point, axis=1)) if len(hits) else np.empty(0)
+        return self._frame(rows[hits], distance)
+
+    def nearest(self, lat, lon, k=10, state=None):
+        """The k places nearest to (lat, lon)."""
+        tree, rows = self._tree(state)
+        k = min(k, len(rows))
+        if k == 0:
+            return self._frame(rows[:0], np.empty(0))
+        chord, hits = tree.query(_unit_vectors([lat], [lon])[0], k=k)
+        return self._frame(rows[np.atleast_1d(hits)], _great_circle(np.atleast_1d(chord)))
+
+    def in_state(self, state):
+        return self._frame(self._tree(state)[1])
+
+    def in_polygon(self, polygon):
+        """Places inside a shapely polygon given in (lon, lat) order."""
+        min_lon, min_lat, max_lon, max_lat = polygon.bounds
+        rows = np.flatnonzero(
+            (self.lon >= min_lon) & (self.lon <= max_lon) & (self.lat >= min_lat) & (self.lat <= max_lat)
+        )
+        rows = rows[shapely.contains_xy(polygon, self.lon[rows], self.lat[rows])]
+        return self._frame(rows)
+
+    def geocode(self, places):
+        """
+        Coordinates for "Name, ST" strings, None for places not in the gazetteer.
+
+        Returns:
+            dict: place -> (lat, lon) or None
+        """
+        if self._by_name is None:
+            self._by_name = {
+                (name.lower(), state): i for i, (name, state) in enumerate(zip(self.names, self.states))
+            }
+        result = {}
+        for place in places:
+            name, _, state = str(place).rpartition(",")
+            row = self._by_name.get((name.strip().lower(), state.strip().upper()))
+            result[place] = None if row is None else (float(self.lat[row]), float(self.lon[row]))
+        return result
@@ -0,0 +1,189 @@
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+DATA_DIR = os.environ.get("RELOC_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+METROS_CSV = "metros.csv"
+OBSERVATIONS_CSV = "market_observations.csv"
+STORE_DIR = ".store"
+
+#observation fields, moving_cost observations also carry the origin metro of the quote
+FIELDS = ("median_sales_price", "house_size", "moving_cost")
+STATS = ("mean", "min", "max", "count")
+
+
+def metro_id(name):
+    """Metro ID for a display name, e.g. "Sonoma, CA" -> "sonoma-ca". IDs are returned unchanged."""
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def build_store(data_dir=DATA_DIR):
+    """
+    Convert the CSV sources in data_dir into one .npy file per column under data_dir/.store.
+    Observations are sorted by metro and stored CSR style ({field}.offsets indexes {field}.value),
+    so a metro's observations are one contiguous slice.
+    """
+    store_dir = os.path.join(data_dir, STORE_DIR)
+    os.makedirs(store_dir, exist_ok=True)
+
+    metros = _read_csv(os.path.join(data_dir, METROS_CSV))
+    ids = [metro_id(row["metro_id"]) for row in metros]
+    position = {id_: i for i, id_ in enumerate(ids)}
+    np.save(os.path.join(store_dir, "lat.npy"), np.array([float(row["lat"]) for row in metros]))
+    np.save(os.path.join(store_dir, "lon.npy"), np.array([float(row["lon"]) for row in metros]))
+
+    observations = {field: [] for field in FIELDS}
+    for row in _read_csv(os.path.join(data_dir, OBSERVATIONS_CSV)):
+        dest = position[metro_id(row["metro_id"])]
+        origin = position[metro_id(row["origin_id"])] if row.get("origin_id") else -1
+        observations[row["field"]].append((dest, origin, float(row["value"])))
+
+    for field, rows in observations.items():
+        rows.sort(key=lambda row: row[0])
+        metro = np.array([row[0] for row in rows], dtype=np.int32)
+        np.save(os.path.join(store_dir, f"{field}.value.npy"), np.array([row[2] for row in rows], dtype=float))
+        np.save(os.path.join(store_dir, f"{field}.origin.npy"), np.array([row[1] for row in rows], dtype=np.int32))
+        np.save(
+            os.path.join(store_dir, f"{field}.offsets.npy"),
+            np.searchsorted(metro, np.arange(len(ids) + 1)).astype(np.int64),
+        )
+
+    manifest = {
+        "ids": ids,
+        "names": [row["name"] for row in metros],
+        "states": [row["state"] for row in metros],
+    }
+    with open(os.path.join(store_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+class MarketDataStore:
+    """
+    Per-metro market observations (median sales price, house size, moving cost) indexed by metro ID.
+
+    Columns are memory-mapped .npy files loaded on first use, and all lookups take a list of metro IDs
+    and only touch those rows. Use MarketDataStore.open() to (re)build the files from the CSV sources.
+
+    Example:
+        >>> store = MarketDataStore.open()
+        >>> store.summary("median_sales_price", ["sonoma-ca", "durham-nc"])
+        array([894854.25, 513750.  ])
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.store_dir = os.path.join(data_dir, STORE_DIR)
+        with open(os.path.join(self.store_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.ids = manifest["ids"]
+        self.names = manifest["names"]
+        self.states = manifest["states"]
+        self._position = {id_: i for i, id_ in enumerate(self.ids)}
+        self._columns = {}
+
+    @classmethod
+    def open(cls, data_dir=DATA_DIR):
+        """Open the store, rebuilding the column files first if the CSV sources are newer."""
+        manifest = os.path.join(data_dir, STORE_DIR, "manifest.json")
+        sources = [os.path.join(data_dir, name) for name in (METROS_CSV, OBSERVATIONS_CSV)]
+        if not os.path.exists(manifest) or max(map(os.path.getmtime, sources)) > os.path.getmtime(manifest):
+            build_store(data_dir)
+        return cls(data_dir)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, metro):
+        return metro_id(metro) in self._position
+
+    def column(self, name):
+        """Memory-mapped column, e.g. "lat", "lon" or "moving_cost.value"."""
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.store_dir, f"{name}.npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def index(self, metros):
+        """Row positions for a list of metro IDs or display names. Raises KeyError on unknown metros."""
+        try:
+            return np.array([self._position[metro_id(metro)] for metro in metros], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"Unknown metro {e.args[0]!r}, add it to {METROS_CSV}") from None
+
+    def coordinates(self, metros):
+        """(len(metros), 2) array of latitude, longitude."""
+        rows = self.index(metros)
+        return np.column_stack([self.column("lat")[rows], self.column("lon")[rows]])
+
+    def display_names(self, metros):
+        return [self.names[i] for i in self.index(metros)]
+
+    def _gather(self, field, rows):
+        """Observation positions for the given rows and the position in rows each one belongs to."""
+        offsets = self.column(f"{field}.offsets")
+        starts = np.asarray(offsets[rows])
+        counts = np.asarray(offsets[rows + 1]) - starts
+        owner = np.repeat(np.arange(len(rows)), counts)
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return positions, owner
+
+    def observations(self, field, metros):
+        """List with the raw observation array for each metro."""
+        positions, owner = self._gather(field, self.index(metros))
+        values = np.asarray(self.column(f"{field}.value")[positions])
+        return np.split(values, np.searchsorted(owner, np.arange(1, len(metros))))
+
+    def summary(self, field, metros, stat="mean"):
+        """
+        One statistic per metro over its observations, NaN where a metro has none.
+
+        Args:
+            field: one of FIELDS
+            metros: metro IDs or display names
+            stat: one of STATS
+        """
+        if stat not in STATS:
+            raise ValueError(f"stat must be one of {STATS}, got {stat!r}")
+        rows = self.index(metros)
+        positions, owner = self._gather(field, rows)
+        values = np.asarray(self.column(f"{field}.value")[positions])
+        return _reduce(values, owner, len(rows), stat)
+
+    def moving_cost_matrix(self, origins, destinations, stat="mean"):
+        """(len(origins), len(destinations)) moving cost statistic per pair, NaN where no quote exists."""
+        if stat not in STATS:
+            raise ValueError(f"stat must be one of {STATS}, got {stat!r}")
+        origin_rows = self.index(origins)
+        dest_rows = self.index(destinations)
+        positions, owner = self._gather("moving_cost", dest_rows)
+        quote_origin = np.asarray(self.column("moving_cost.origin")[positions])
+
+        #map each quote's origin metro to its position in origins, dropping quotes from other origins
+        lookup = np.full(len(self), -1, dtype=np.int64)
+        lookup[origin_rows] = np.arange(len(origin_rows))
+        origin_pos = np.where(quote_origin >= 0, lookup[quote_origin], -1)
+        keep = origin_pos >= 0
+        values = np.asarray(self.column("moving_cost.value")[positions[keep]])
+        cells = origin_pos[keep] * len(dest_rows) + owner[keep]
+        flat = _reduce(values, cells, len(origin_rows) * len(dest_rows), stat)
+        return flat.reshape(len(origin_rows), len(dest_rows))
+
+
+def _reduce(values, groups, n, stat):
+    counts = np.bincount(groups, minlength=n).astype(float)
+    if stat == "count":
+        return counts
+    if stat == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.bincount(groups, weights=values, minlength=n) / np.where(counts > 0, counts, np.nan)
+    out = np.full(n, np.inf if stat == "min" else -np.inf)
+    (np.minimum if stat == "min" else np.maximum).at(out, groups, values)
+    out[counts == 0] = np.nan
+    return out
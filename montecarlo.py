@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from relocation import relocation_costs
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def observed_ranges(store, origin, destinations):
+    """
+    Low/high bounds of the observations behind each input: the origin price, each destination price and
+    each origin -> destination moving quote. A single observation gives a zero-width range.
+    """
+    return {
+        "origin_price": store.summary("median_sales_price", [origin], "min")[0],
+        "origin_price_high": store.summary("median_sales_price", [origin], "max")[0],
+        "dest_price": store.summary("median_sales_price", destinations, "min"),
+        "dest_price_high": store.summary("median_sales_price", destinations, "max"),
+        "moving_cost": store.moving_cost_matrix([origin], destinations, "min")[0],
+        "moving_cost_high": store.moving_cost_matrix([origin], destinations, "max")[0],
+    }
+
+
+def _cost_bounds(ranges, complete, fees):
+    """Exact min/max cost per destination: the cost is linear in every input, so it is attained at a corner."""
+    corners = [
+        relocation_costs(origin, dest[complete], moving[complete], **fees)
+        for origin in (ranges["origin_price"], ranges["origin_price_high"])
+        for dest in (ranges["dest_price"], ranges["dest_price_high"])
+        for moving in (ranges["moving_cost"], ranges["moving_cost_high"])
+    ]
+    return np.min(corners, axis=0), np.max(corners, axis=0)
+
+
+def _uniform(rng, low, high, size):
+    """Uniform float32 samples; float32 halves the memory traffic of the (draws, destinations) arrays."""
+    low = np.float32(low) if np.ndim(low) == 0 else np.asarray(low, dtype=np.float32)
+    samples = rng.random(size, dtype=np.float32)
+    samples *= np.asarray(high, dtype=np.float32) - low
+    samples += low
+    return samples
+
+
+def simulate_relocation_costs(
+    store,
+    origin,
+    destinations,
+    draws=100_000,
+    top_k=3,
+    rank_draws=10_000,
+    chunk_size=20_000,
+    bins=1024,
+    seed=None,
+    **fees,
+):
+    """
+    Monte Carlo relocation costs from origin to every destination at once.
+
+    Each draw samples the origin price, every destination price and every moving quote uniformly from
+    its observed range (the origin price is shared by all destinations in a draw) and evaluates
+    relocation_costs on a whole (draws, destinations) chunk. Percentiles come from per-destination
+    histograms over the exact cost bounds (resolution (max - min) / bins), so the draws are never
+    held in memory at once; rank stability is estimated on the first rank_draws draws.
+
+    Args:
+        store: market_data.MarketDataStore
+        origin: origin metro ID or name
+        destinations: destination metro IDs or names
+        draws: number of simulated draws
+        top_k: report the probability of each destination being among the top_k cheapest
+        fees: fee overrides passed on to relocation_costs (prep_cost, percent_sale_comission, ...)
+
+    Returns:
+        pd.DataFrame: one row per destination, cheapest median first, with name, lat, lon, mean, p5..p95,
+        spread (p95 - p5), p_cheapest, p_top_k, modal_rank and rank_stability (share of draws at the modal rank).
+        Destinations without price or moving observations are left out and listed in table.attrs["missing"].
+    """
+    ranges = observed_ranges(store, origin, destinations)
+    complete = ~(np.isnan(ranges["dest_price"]) | np.isnan(ranges["moving_cost"]))
+    if np.isnan(ranges["origin_price"]):
+        complete[:] = False
+    kept = [dest for dest, ok in zip(destinations, complete) if ok]
+    missing = [dest for dest, ok in zip(destinations, complete) if not ok]
+    if not kept:
+        table = pd.DataFrame()
+        table.attrs["missing"] = missing
+        return table
+
+    rng = np.random.default_rng(seed)
+    dest_low, dest_high = ranges["dest_price"][complete], ranges["dest_price_high"][complete]
+    move_low, move_high = ranges["moving_cost"][complete], ranges["moving_cost_high"][complete]
+    m = len(kept)
+    low, high = _cost_bounds(ranges, complete, fees)
+    scale = bins / np.where(high > low, high - low, 1.0)
+    low32, scale32 = low.astype(np.float32), scale.astype(np.float32)
+    offsets = np.arange(m) * bins
+
+    hist = np.zeros((m, bins), dtype=np.int64)
+    total = np.zeros(m)
+    rank_counts = np.zeros(m * m, dtype=np.int64)
+    ranked = 0
+    for start in range(0, draws, chunk_size):
+        n = min(chunk_size, draws - start)
+        costs = relocation_costs(
+            _uniform(rng, ranges["origin_price"], ranges["origin_price_high"], (n, 1)),
+            _uniform(rng, dest_low, dest_high, (n, m)),
+            _uniform(rng, move_low, move_high, (n, m)),
+            **fees,
+        )
+        total += costs.sum(axis=0, dtype=np.float64)
+        cells = np.clip(((costs - low32) * scale32).astype(np.intp), 0, bins - 1)
+        cells += offsets
+        hist += np.bincount(cells.ravel(), minlength=m * bins).reshape(m, bins)
+
+        #rank 0 is the cheapest destination of a draw
+        if ranked < rank_draws:
+            sample = costs[:rank_draws - ranked]
+            order = np.argsort(sample, axis=1)
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, np.arange(m)[None, :], axis=1)
+            rank_counts += np.bincount((np.arange(m) * m + ranks).ravel(), minlength=m * m)
+            ranked += len(sample)
+
+    #percentiles from the histograms, interpolating linearly inside the bin
+    cumulative = hist.cumsum(axis=1)
+    bands = {}
+    for p in PERCENTILES:
+        target = p / 100 * draws
+        bin_ = np.minimum((cumulative < target).sum(axis=1), bins - 1)
+        before = np.where(bin_ > 0, cumulative[np.arange(m), bin_ - 1], 0)
+        inside = hist[np.arange(m), bin_]
+        fraction = np.divide(target - before, inside, out=np.zeros(m), where=inside > 0)
+        #a zero-width cost range is a single value, not a bin to interpolate in
+        bands[f"p{p}"] = np.where(high > low, low + (bin_ + fraction) / scale, low)
+    rank_share = rank_counts.reshape(m, m) / ranked
+
+    coordinates = store.coordinates(kept)
+    table = pd.DataFrame({
+        "name": store.display_names(kept),
+        "lat": coordinates[:, 0],
+        "lon": coordinates[:, 1],
+        "mean": total / draws,
+        **bands,
+    })
+    table["spread"] = table[f"p{PERCENTILES[-1]}"] - table[f"p{PERCENTILES[0]}"]
+    table["p_cheapest"] = rank_share[:, 0]
+    table[f"p_top_{top_k}"] = rank_share[:, :top_k].sum(axis=1)
+    table["modal_rank"] = rank_share.argmax(axis=1) + 1
+    table["rank_stability"] = rank_share.max(axis=1)
+    table = table.sort_values("p50").reset_index(drop=True)
+    table.attrs["missing"] = missing
+    return table
+
+
+def uncertainty_map(table, **kwargs):
+    """scatter_map of a simulate_relocation_costs table: color by median cost, size by spread (p95 - p5)."""
+    import plotly.express as px
+
+    options = dict(
+        color_continuous_scale=px.colors.sequential.Magma,
+        size_max=25,
+        zoom=2,
+        hover_data=["p5", "p95", "p_cheapest", "rank_stability"],
+    )
+    options.update(kwargs)
+    return px.scatter_map(table, lat="lat", lon="lon", text="name", color="p50", size="spread", **options)
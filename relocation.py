@@ -0,0 +1,106 @@
+import numpy as np
+
+#default fee parameters, same values calculate_relocation_costs used to hardcode
+PREP_COST = 10000.00
+PERCENT_SALE_COMISSION = 0.05
+PERCENT_CLOSING_COST = 0.02
+PAYOFF_LOAN_AMOUNT = 100000.00
+
+
+def _as_float(values):
+    """Array of the values, keeping float32 inputs in float32 (large simulations) and casting the rest to float."""
+    values = np.asarray(values)
+    return values if values.dtype.kind == "f" else values.astype(float)
+
+
+def relocation_costs(
+    median_sales_price_origin,
+    median_sales_price_dest,
+    estimated_moving_costs,
+    prep_cost=PREP_COST,
+    percent_sale_comission=PERCENT_SALE_COMISSION,
+    percent_closing_cost=PERCENT_CLOSING_COST,
+    payoff_loan_amount=PAYOFF_LOAN_AMOUNT,
+):
+    """
+    Elementwise relocation cost. All arguments are broadcast against each other with
+    normal NumPy rules, so scalars, per-row arrays and full matrices can be mixed.
+
+    Returns:
+        np.ndarray: relocation costs (not rounded), shape of the broadcast inputs
+    """
+    origin = _as_float(median_sales_price_origin)
+    dest = _as_float(median_sales_price_dest)
+
+    #calculate comissions
+    sale_comission = np.multiply(percent_sale_comission, origin)
+    closing_cost = np.multiply(percent_closing_cost, dest)
+
+    #net proceeds from sale of house
+    net_proceeds = origin - (sale_comission + prep_cost + payoff_loan_amount)
+
+    #remainder after purchase of new home
+    sale_surplus = net_proceeds - (dest + closing_cost)
+
+    #relocation cost
+    return _as_float(estimated_moving_costs) - sale_surplus
+
+
+def _per_row(values, n, name):
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        return np.full((n, 1), float(values))
+    if values.shape != (n,):
+        raise ValueError(f"{name} must be a scalar or have one entry per origin ({n}), got shape {values.shape}")
+    return values[:, None]
+
+
+def relocation_cost_matrix(
+    origin_prices,
+    dest_prices,
+    moving_costs,
+    prep_cost=PREP_COST,
+    percent_sale_comission=PERCENT_SALE_COMISSION,
+    percent_closing_cost=PERCENT_CLOSING_COST,
+    payoff_loan_amount=PAYOFF_LOAN_AMOUNT,
+    decimals=2,
+):
+    """
+    Relocation costs for every origin x destination pair in one call.
+
+    Args:
+        origin_prices: (N,) median sales prices at the origins
+        dest_prices: (M,) median sales prices at the destinations
+        moving_costs: (N, M) moving cost matrix; an (M,) row or a scalar is broadcast
+        prep_cost, payoff_loan_amount: scalar or (N,) per-origin amounts
+        percent_sale_comission: scalar or (N,) fraction of the origin price
+        percent_closing_cost: scalar or (N,) fraction of the destination price
+        decimals: rounding applied to the result, None to skip
+
+    Returns:
+        np.ndarray: (N, M) relocation cost matrix
+    """
+    origin = np.atleast_1d(np.asarray(origin_prices, dtype=float))
+    dest = np.atleast_1d(np.asarray(dest_prices, dtype=float))
+    if origin.ndim != 1 or dest.ndim != 1:
+        raise ValueError("origin_prices and dest_prices must be one-dimensional")
+    n, m = origin.size, dest.size
+
+    moving = np.asarray(moving_costs, dtype=float)
+    try:
+        moving = np.broadcast_to(moving, (n, m))
+    except ValueError:
+        raise ValueError(f"moving_costs must broadcast to ({n}, {m}), got shape {moving.shape}") from None
+
+    costs = relocation_costs(
+        origin[:, None],
+        dest[None, :],
+        moving,
+        prep_cost=_per_row(prep_cost, n, "prep_cost"),
+        percent_sale_comission=_per_row(percent_sale_comission, n, "percent_sale_comission"),
+        percent_closing_cost=_per_row(percent_closing_cost, n, "percent_closing_cost"),
+        payoff_loan_amount=_per_row(payoff_loan_amount, n, "payoff_loan_amount"),
+    )
+    if decimals is not None:
+        costs = np.round(costs, decimals)
+    return costs
@@ -0,0 +1,132 @@
+import atexit
+import os
+import threading
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+#above this many points a figure is switched to WebGL traces and per-point text labels are dropped
+WEBGL_THRESHOLD = int(os.environ.get("RELOC_WEBGL_THRESHOLD", 1000))
+
+#SVG trace types and the WebGL trace type they are switched to
+_WEBGL_TRACES = {
+    "scatter": go.Scattergl,
+    "scattergeo": go.Scattermap,
+}
+_MAP_TRACES = ("scattermap", "scattermapbox")
+
+#Kaleido's sync server is one process-wide task/result queue pair without a lock of its own, so starting,
+#exporting and stopping go through this lock; _server_owner is the renderer that started the server
+_kaleido_lock = threading.RLock()
+_server_owner = None
+
+
+def point_count(fig):
+    count = 0
+    for trace in fig.data:
+        values = getattr(trace, "lat", None)
+        if values is None:
+            values = getattr(trace, "x", None)
+        count += 0 if values is None else len(values)
+    return count
+
+
+def prepare_figure(fig, webgl_threshold=WEBGL_THRESHOLD):
+    """
+    Copy of fig that is cheap to render: above webgl_threshold points, SVG scatter/scattergeo traces become
+    scattergl/scatter_map traces and text labels are moved to hover text. Small figures are returned as is.
+    """
+    if point_count(fig) <= webgl_threshold:
+        return fig
+    fig = go.Figure(fig)
+    traces = []
+    for trace in fig.data:
+        props = trace.to_plotly_json()
+        if props.pop("type", None) in _WEBGL_TRACES:
+            props.pop("geo", None)
+            trace = _WEBGL_TRACES[trace.type](props, skip_invalid=True)
+        if trace.type in _MAP_TRACES + ("scattergl",) and trace.mode and "text" in trace.mode:
+            #thousands of symbol-layer labels dominate render time, keep them as hover text only
+            trace.update(mode="markers", hovertext=trace.hovertext if trace.hovertext is not None else trace.text)
+        traces.append(trace)
+    converted = go.Figure(data=traces, layout=fig.layout)
+    if any(trace.type == "scattermap" for trace in traces) and converted.layout.map.style is None:
+        converted.update_layout(map_style="carto-positron")
+    return converted
+
+
+class MapRenderer:
+    """
+    Image exporter that keeps one Kaleido/Chromium process warm and exports batches of figures in one pass,
+    instead of paying browser startup on every fig.write_image call. Exports are serialized process wide,
+    and only the renderer that started the server stops it.
+
+    Example:
+        >>> with MapRenderer() as renderer:
+        ...     renderer.export([fig_sonoma, fig_napa], ["saved_map_sonoma.png", "saved_map_napa.png"])
+    """
+
+    def __init__(self, webgl_threshold=WEBGL_THRESHOLD, width=None, height=None, scale=None):
+        self.webgl_threshold = webgl_threshold
+        self.width = width
+        self.height = height
+        self.scale = scale
+
+    def start(self):
+        """Start the persistent exporter, Kaleido < 1.0 keeps its own process alive after the first export."""
+        global _server_owner
+        with _kaleido_lock:
+            if _server_owner is not None:
+                return self
+            import kaleido
+
+            if hasattr(kaleido, "start_sync_server"):
+                kaleido.start_sync_server(silence_warnings=True)
+                _server_owner = self
+        return self
+
+    def close(self):
+        global _server_owner
+        with _kaleido_lock:
+            if _server_owner is self:
+                import kaleido
+
+                kaleido.stop_sync_server(silence_warnings=True)
+                _server_owner = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def export(self, figs, paths):
+        """Export figures to image files (format from the extension) in a single exporter pass."""
+        if len(figs) != len(paths):
+            raise ValueError(f"Got {len(figs)} figures but {len(paths)} paths")
+        figs = [prepare_figure(fig, self.webgl_threshold) for fig in figs]
+        options = dict(width=self.width, height=self.height, scale=self.scale)
+        with _kaleido_lock:
+            self.start()
+            if hasattr(pio, "write_images"):
+                pio.write_images(figs, paths, **options)
+            else:
+                for fig, path in zip(figs, paths):
+                    pio.write_image(fig, path, **options)
+        return list(paths)
+
+    def export_one(self, fig, path):
+        return self.export([fig], [path])[0]
+
+
+_default_renderer = None
+
+
+def get_renderer():
+    """Process-wide renderer, started on first use."""
+    global _default_renderer
+    with _kaleido_lock:
+        if _default_renderer is None:
+            _default_renderer = MapRenderer().start()
+            atexit.register(_default_renderer.close)
+    return _default_renderer
@@ -0,0 +1,60 @@
+import pytest
+
+import app
+
+
+class FakeAgents:
+    def __init__(self):
+        self.map_paths = []
+        self.expected_points = []
+
+    def run(self, task, map_path, expected_points=None):
+        self.map_paths.append(map_path)
+        self.expected_points.append(expected_points)
+        return "done"
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    fake = FakeAgents()
+    monkeypatch.setattr(app, "_agents", fake)
+    return fake
+
+
+@pytest.mark.parametrize("query, error", [
+    ({"origin_lat": "abc"}, "origin_lat and origin_lon must be numbers"),
+    ([{"region": "Florida"}], "A query must be a JSON object, got list"),
+    ("Florida", "A query must be a JSON object, got str"),
+    ({"count": "ten"}, "count must be an integer"),
+    ({"count": 0}, "count must be at least 1"),
+])
+def test_invalid_queries_return_error_results(agents, query, error):
+    result = app.run_query(query)
+    assert result["status"] == "error"
+    assert result["error"] == error
+    assert agents.map_paths == []
+
+
+def test_origin_coords_comes_from_lat_lon_only(agents):
+    task, _ = app.build_task({"origin_coords": "ignored", "origin_lat": -33.8688, "origin_lon": 151.2093})
+    assert "(33.8688° S, 151.2093° E)" in task
+    assert "ignored" not in task
+    assert app.run_query({"origin_coords": "ignored", "id": "q1"})["status"] == "ok"
+
+
+def test_server_queries_get_their_own_map_path(agents, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "MAP_DIR", str(tmp_path))
+    first = app.run_query({"id": "a/b"}, unique_map=True)
+    second = app.run_query({"id": "a/b"}, unique_map=True)
+    explicit = app.run_query({"map_path": "mine.png"}, unique_map=True)
+    assert first["map_path"] != second["map_path"]
+    assert first["map_path"].startswith(str(tmp_path / "map_a_b_"))
+    assert explicit["map_path"] == "mine.png"
+    assert agents.map_paths == [first["map_path"], second["map_path"], "mine.png"]
+    assert app.run_query({})["map_path"] == app.DEFAULT_QUERY["map_path"]
+
+
+def test_plot_check_expects_the_query_count(agents):
+    app.run_query({"count": "5"})
+    app.run_query({})
+    assert agents.expected_points == [5, app.DEFAULT_QUERY["count"]]
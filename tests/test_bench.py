@@ -0,0 +1,40 @@
+from bench import regressions, run_suite, summarize
+
+
+def test_errors_from_zero_baseline_regress():
+    baseline = {"all": {"runs": 5, "errors": 0, "retries": 0, "duration_p50": 1.0}}
+    summary = {"all": {"runs": 5, "errors": 2, "retries": 1, "duration_p50": 1.1}}
+    assert regressions(summary, baseline) == ["all.errors_per_run: 0.0 -> 0.4", "all.retries_per_run: 0.0 -> 0.2"]
+
+
+def test_relative_tolerance_and_zero_baselines():
+    baseline = {"all": {"runs": 5, "errors": 1, "duration_p50": 1.0, "steps_p50": 0.0}}
+    assert regressions({"all": {"runs": 9, "errors": 1, "duration_p50": 1.15, "steps_p50": 0.0}}, baseline) == []
+    assert regressions({"all": {"runs": 5, "errors": 2, "duration_p50": 1.3, "steps_p50": 1.0}}, baseline) == [
+        "all.errors_per_run: 0.2 -> 0.4",
+        "all.duration_p50: 1.0 -> 1.3",
+        "all.steps_p50: 0.0 -> 1.0",
+    ]
+
+
+def test_counts_are_compared_per_run():
+    baseline = {"all": {"runs": 5, "errors": 1, "retries": 2}, "tools": {"geocode_places": {"calls": 10}}}
+    more_repeats = {"all": {"runs": 20, "errors": 4, "retries": 8}, "tools": {"geocode_places": {"calls": 40}}}
+    assert regressions(more_repeats, baseline) == []
+    #the same totals over fewer runs are a real regression
+    assert regressions(baseline, more_repeats) == [] and regressions(
+        {"all": {"runs": 5, "errors": 4, "retries": 2}, "tools": {"geocode_places": {"calls": 40}}}, more_repeats
+    ) == ["all.errors_per_run: 0.2 -> 0.8", "tools.geocode_places.calls_per_run: 2.0 -> 8.0"]
+
+
+def test_tool_latency_regressions_are_reported():
+    baseline = {"all": {"runs": 5}, "tools": {"find_candidate_towns": {"calls": 5, "duration_p50": 0.01, "duration_p99": 0.02}}}
+    summary = {"all": {"runs": 5}, "tools": {"find_candidate_towns": {"calls": 5, "duration_p50": 0.011, "duration_p99": 0.05}}}
+    assert regressions(summary, baseline) == ["tools.find_candidate_towns.duration_p99: 0.02 -> 0.05"]
+    assert regressions({"all": {"runs": 5}, "tools": {"new_tool": {"duration_p50": 1.0}}}, baseline) == []
+
+
+def test_suite_runs_without_errors():
+    summary = summarize(run_suite(repeats=1))
+    assert summary["all"]["runs"] == 3
+    assert summary["all"]["errors"] == 0
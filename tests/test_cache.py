@@ -0,0 +1,90 @@
+import pytest
+from smolagents import Tool
+
+import cache
+from cache import CacheMissError, CachedTool, DiskCache, cached_visit_tool
+
+
+class FakeVisitTool(Tool):
+    name = "visit_webpage"
+    description = "Visits a webpage."
+    inputs = {"url": {"type": "string", "description": "The url."}}
+    output_type = "string"
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = list(pages)
+        self.calls = 0
+
+    def forward(self, url: str) -> str:
+        self.calls += 1
+        return self.pages.pop(0)
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return lambda **kwargs: DiskCache(path=str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_ttl_expires_entries(disk_cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    store = disk_cache(ttl=60, max_entries=None)
+    store.set("k", {"v": 1})
+    now[0] += 59
+    assert store.get("k") == {"v": 1}
+    now[0] += 2
+    assert store.get("k") is None
+    assert store.get("k", ignore_ttl=True) == {"v": 1}
+    assert (store.hits, store.misses) == (2, 1)
+
+
+def test_lru_evicts_least_recently_used(disk_cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    store = disk_cache(ttl=None, max_entries=2)
+    for key in ("a", "b"):
+        now[0] += 1
+        store.set(key, key)
+    now[0] += 1
+    store.get("a")
+    now[0] += 1
+    store.set("c", "c")
+    assert len(store) == 2
+    assert store.get("b") is None
+    assert (store.get("a"), store.get("c")) == ("a", "c")
+
+
+def test_namespaces_are_independent(disk_cache):
+    first, second = disk_cache(namespace="one"), disk_cache(namespace="two")
+    first.set("k", 1)
+    assert second.get("k") is None
+    first.clear()
+    assert len(first) == 0
+
+
+def test_replay_miss_raises_and_hit_ignores_ttl(disk_cache):
+    store = disk_cache(ttl=0)
+    tool = FakeVisitTool(["page"])
+    CachedTool(tool, cache=store)(url="https://example.com/a")
+    replay = CachedTool(tool, cache=store, replay=True)
+    assert replay(url="https://example.com/a") == "page"
+    with pytest.raises(CacheMissError):
+        replay(url="https://example.com/b")
+    assert tool.calls == 1
+
+
+def test_visit_error_messages_are_not_cached(disk_cache):
+    tool = FakeVisitTool([
+        "The request timed out. Please try again later or check the URL.",
+        "Error fetching the webpage: 429 Client Error: Too Many Requests",
+        "# Durham, NC housing market",
+    ])
+    cached = cached_visit_tool(tool, cache=disk_cache())
+    url = "https://www.example.com/durham/"
+    assert cached(url=url).startswith("The request timed out")
+    assert cached(url=url).startswith("Error fetching the webpage")
+    assert cached(url=url) == "# Durham, NC housing market"
+    #normalized URL, served from the cache
+    assert cached(url="https://example.com/durham#prices") == "# Durham, NC housing market"
+    assert tool.calls == 3
@@ -0,0 +1,77 @@
+from checks import VerdictCache, validate_map_figure
+
+
+def _steps(start, tokens, call_id):
+    return [
+        {"task": "Find towns", "timing": {"start_time": start, "end_time": start + 1.0}, "token_usage": None},
+        {
+            "step_number": 1,
+            "timing": {"start_time": start + 1.0, "end_time": start + 3.5, "duration": 2.5},
+            "token_usage": {"input_tokens": tokens, "output_tokens": tokens // 10},
+            "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "python_interpreter", "arguments": "x = 1"}}],
+            "model_output": "Thought: compute.",
+            "code_action": "x = 1",
+            "observations": "Execution logs: ok",
+            "error": None,
+        },
+    ]
+
+
+def test_key_ignores_timing_token_usage_and_call_ids():
+    image = b"png bytes"
+    assert VerdictCache.key(image, _steps(100.0, 900, "call_a")) == VerdictCache.key(image, _steps(250.0, 1200, "call_b"))
+
+
+def test_key_changes_with_reasoning_or_image():
+    steps = _steps(100.0, 900, "call_a")
+    changed = _steps(100.0, 900, "call_a")
+    changed[1]["observations"] = "Execution logs: other"
+    assert VerdictCache.key(b"png", steps) != VerdictCache.key(b"png", changed)
+    assert VerdictCache.key(b"png", steps) != VerdictCache.key(b"other png", steps)
+
+
+def _map(lat, lon, color, **kwargs):
+    import plotly.express as px
+
+    return px.scatter_map(lat=lat, lon=lon, color=color, **kwargs)
+
+
+#Durham, Asheville, Sonoma
+LAT, LON, COST = [35.99, 35.60, 38.29], [-78.90, -82.55, -122.46], [120000.0, 95000.0, 140000.0]
+
+
+def test_valid_map_passes():
+    assert validate_map_figure(_map(LAT, LON, COST), min_points=3, max_points=4) == []
+
+
+def test_non_scattermap_trace():
+    import plotly.express as px
+
+    problems = validate_map_figure(px.scatter_geo(lat=LAT, lon=LON, color=COST))
+    assert problems[0] == "Trace 0 is scattergeo, the map must be made with px.scatter_map"
+    assert validate_map_figure("saved_map.png") == ["The final answer should be the plotly figure, got str"]
+
+
+def test_swapped_or_out_of_range_coordinates():
+    assert "are lat and lon swapped?" in validate_map_figure(_map(LON, LAT, COST))[0]
+    assert "are lat and lon swapped?" in validate_map_figure(_map([95.0, 10.0, 20.0], [0.0, 0.0, 0.0], COST))[0]
+
+
+def test_string_or_discrete_color():
+    import plotly.graph_objects as go
+
+    fig = _map(LAT, LON, COST)
+    fig.data[0].marker.color = "red"
+    assert validate_map_figure(fig) == ['Trace 0 colors are not bound to a column, pass color="relocation_cost"']
+    #a discrete color column gives one trace per category with a single string color each
+    problems = validate_map_figure(_map(LAT, LON, ["NC", "NC", "WI"]))
+    assert problems and all("not bound to a column" in problem for problem in problems)
+    labels = go.Figure(go.Scattermap(lat=LAT, lon=LON, marker={"color": ["green", "green", "red"]}))
+    assert validate_map_figure(labels) == ["Trace 0 colors are not numeric relocation costs"]
+
+
+def test_point_count_against_the_query():
+    assert validate_map_figure(_map(LAT, LON, COST), min_points=10) == ["The map shows 3 points, expected at least 10"]
+    assert validate_map_figure(_map(LAT, LON, COST), min_points=1, max_points=2) == [
+        "The map shows 3 points, expected at most 2"
+    ]
@@ -0,0 +1,61 @@
+import pytest
+
+from extract import extract_records
+
+
+@pytest.mark.parametrize("html, price", [
+    ("<p>Median sale price: $425,000, up 3% from last year</p>", 425000.0),
+    ("<p>The median home price was $1.2M in 2024</p>", 1200000.0),
+    ("<p>Median Sale Price per Sq Ft $250. Median sale price $510K</p>", 510000.0),
+    ("<p>Median sale price $425,000. Median price per sq ft $250</p>", 425000.0),
+])
+def test_median_sale_price(html, price):
+    record = extract_records(html, "u")
+    assert record["median_sale_price"] == price
+    assert record["status"] == "found"
+
+
+@pytest.mark.parametrize("html", [
+    "<p>The median price per square foot is $350</p>",
+    "<p>Median Sale Price per Sq Ft $412</p>",
+    "<p>Median sale price $350/sqft</p>",
+    "<p>Median sale price $350 per sq ft</p>",
+    "<p>Median listing price psf $298</p>",
+])
+def test_median_price_per_square_foot_is_not_a_sale_price(html):
+    record = extract_records(html, "u")
+    assert record["median_sale_price"] is None
+    assert record["status"] == "not found"
+
+
+def test_moving_cost_range_needs_moving_words():
+    html = "<p>Full-service movers charge $4,200 - $6,800 for a 2,000 sq ft home. Taxes run $100 to $300.</p>"
+    record = extract_records(html, "u")
+    assert (record["moving_cost_low"], record["moving_cost_high"]) == (4200.0, 6800.0)
+    assert record["square_feet"] == 2000.0
+
+
+def test_concurrent_first_calls_share_one_set_of_pools(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import extract
+    from cache import DiskCache
+
+    monkeypatch.setattr(extract, "fetch_html", lambda url, limiter=None: f"<p>Median sale price ${len(url)},000</p>")
+    tool = extract.ExtractPageRecordsTool(cache=DiskCache(path=str(tmp_path / "cache.sqlite")), max_workers=2)
+    pools = []
+    setup = tool.setup
+
+    def counting_setup():
+        setup()
+        pools.append((tool._fetchers, tool._parsers))
+
+    tool.setup = counting_setup
+    try:
+        with ThreadPoolExecutor(4) as callers:
+            results = list(callers.map(lambda i: tool(urls=[f"https://example.com/{i}"]), range(4)))
+        assert len({(id(fetchers), id(parsers)) for fetchers, parsers in pools}) == 1
+        assert [record["median_sale_price"] for [record] in results] == [21000.0] * 4
+    finally:
+        tool.close()
+    assert tool._parsers is None and not tool.is_initialized
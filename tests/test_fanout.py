@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from fanout import HostRateLimiter, parse_research, research_destinations
+
+GOOD = '{"median_sales_price": 513750, "house_size": 1900, "moving_cost_low": 2640, "moving_cost_high": 5800, "sources": ["https://example.com"]}'
+
+
+#what each fake agent does, by destination: (answer, seconds before answering)
+BEHAVIOUR = {
+    "Slow, NC": (GOOD, 10),
+    "Bad, NC": ("no json here", 0),
+    "Good, NC": (GOOD, 0.05),
+}
+
+
+class FakeAgent:
+    """Stand-in web agent: answers for the destination in its task, or stops early when interrupted."""
+
+    created = []
+
+    def __init__(self):
+        self.interrupted = threading.Event()
+        self.destination = None
+        FakeAgent.created.append(self)
+
+    def run(self, task):
+        self.destination = next(destination for destination in BEHAVIOUR if destination in task)
+        answer, delay = BEHAVIOUR[self.destination]
+        if self.interrupted.wait(delay):
+            raise RuntimeError("interrupted")
+        return answer
+
+    def interrupt(self):
+        self.interrupted.set()
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(min_interval=0.1)
+    times = {"a": [], "b": []}
+
+    def call(host):
+        limiter.wait(host)
+        times[host].append(time.monotonic())
+
+    threads = [threading.Thread(target=call, args=(host,)) for host in ("a", "a", "a", "b")]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gaps = [later - earlier for earlier, later in zip(sorted(times["a"]), sorted(times["a"])[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
+    #another host does not wait behind "a"
+    assert times["b"][0] - started < 0.05
+
+
+def test_parse_research():
+    assert parse_research(f"Here you go: {GOOD} done")["median_sales_price"] == 513750
+    assert parse_research({"house_size": 1900}) == {
+        "median_sales_price": None, "house_size": 1900, "moving_cost_low": None, "moving_cost_high": None, "sources": None,
+    }
+    with pytest.raises(ValueError, match="No JSON object"):
+        parse_research("I could not find anything")
+    with pytest.raises(ValueError, match="Expected a JSON object"):
+        parse_research(["not", "a", "dict"])
+
+
+def test_research_destinations_merges_ok_error_and_timeout():
+    FakeAgent.created.clear()
+    started = time.monotonic()
+    table = research_destinations(list(BEHAVIOUR), FakeAgent, "Sonoma, CA", max_workers=3, timeout=0.3)
+    assert time.monotonic() - started < 3
+
+    #rows keep the input order whatever order the agents finish in
+    assert list(table["destination"]) == ["Slow, NC", "Bad, NC", "Good, NC"]
+    assert list(table["status"]) == ["timeout", "error", "ok"]
+    assert [agent.destination for agent in FakeAgent.created if agent.interrupted.is_set()] == ["Slow, NC"]
+    assert "No JSON object" in table.loc[1, "error"]
+    assert table.loc[2, "median_sales_price"] == 513750
+    assert table.loc[2, "sources"] == ["https://example.com"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+import shapely
+
+from gazetteer import EARTH_RADIUS_KM, Gazetteer
+
+SONOMA = (38.2919, -122.4580)
+ASHEVILLE = (35.5951, -82.5515)
+
+
+@pytest.fixture(scope="module")
+def places():
+    return Gazetteer.load()
+
+
+def _haversine(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, np.asarray(lats), np.asarray(lons)))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _brute_force(places, lat, lon):
+    distance = _haversine(lat, lon, places.lat, places.lon)
+    order = np.argsort(distance, kind="stable")
+    return [f"{places.names[i]}, {places.states[i]}" for i in order], distance[order]
+
+
+def test_nearest_order_and_distances(places):
+    names, distances = _brute_force(places, *SONOMA)
+    nearest = places.nearest(*SONOMA, k=4)
+    assert list(nearest["name"]) == names[:4]
+    assert nearest["name"][0] == "Sonoma, CA" and nearest["distance_km"][0] == 0
+    np.testing.assert_allclose(nearest["distance_km"], distances[:4], atol=0.06)
+    assert nearest["distance_km"].is_monotonic_increasing
+
+
+def test_within_radius_matches_brute_force(places):
+    names, distances = _brute_force(places, *ASHEVILLE)
+    nearby = places.within_radius(*ASHEVILLE, radius_km=100)
+    assert list(nearby["name"]) == [name for name, d in zip(names, distances) if d <= 100]
+    assert "Greenville, SC" in set(nearby["name"])
+    np.testing.assert_allclose(nearby["distance_km"], distances[distances <= 100], atol=0.06)
+    in_nc = places.within_radius(*ASHEVILLE, radius_km=100, state="nc")
+    assert set(in_nc["state"]) == {"NC"}
+    assert list(in_nc["name"]) == [name for name in nearby["name"] if name.endswith(", NC")]
+
+
+def test_unknown_state_gives_empty_frames(places):
+    assert places.in_state("ZZ").empty
+    assert places.within_radius(*ASHEVILLE, radius_km=500, state="ZZ").empty
+    assert places.nearest(*ASHEVILLE, k=5, state="ZZ").empty
+    assert list(places.in_state("NM")["name"]) == ["Albuquerque, NM", "Santa Fe, NM"]
+
+
+def test_k_larger_than_the_rows(places):
+    assert len(places.nearest(*ASHEVILLE, k=1000)) == len(places)
+    assert list(places.nearest(*ASHEVILLE, k=10, state="WI")["name"]) == ["Madison, WI"]
+
+
+def test_in_polygon(places):
+    #longitude first: a box around the Florida peninsula
+    florida = places.in_polygon(shapely.box(-83.0, 25.0, -80.0, 29.0))
+    assert set(florida["name"]) == {
+        "Miami, FL", "Orlando, FL", "Tampa, FL", "Fort Lauderdale, FL", "Sarasota, FL", "Cape Coral, FL",
+    }
+    assert places.in_polygon(shapely.box(-10.0, 40.0, 0.0, 50.0)).empty
+
+
+def test_geocode(places):
+    result = places.geocode(["Durham, NC", "greenville, sc", "Greenville, NC", "Atlantis, ZZ", "Durham"])
+    assert result["Durham, NC"] == (35.99776, -78.90366)
+    assert result["greenville, sc"] == (34.8526, -82.394)
+    assert result["Greenville, NC"] == (35.6127, -77.3664)
+    assert result["Atlantis, ZZ"] is None
+    assert result["Durham"] is None
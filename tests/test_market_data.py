@@ -0,0 +1,92 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from market_data import DATA_DIR, METROS_CSV, OBSERVATIONS_CSV, MarketDataStore
+
+#averages plot.py used to hardcode
+OLD_PRICES = {
+    "Sonoma, CA": (857000 + 927500 + 767000 + 1027917) / 4,
+    "Miami, FL": (593833 + 628000 + 440000) / 3,
+    "Orlando, FL": (372800 + 425000) / 2,
+    "Albuquerque, NM": (347029 + 349921) / 2,
+    "Durham, NC": (515000 + 512500) / 2,
+}
+OLD_HOUSE_SIZES = {"Sonoma, CA": (2200 + 2400) / 2, "Madison, WI": (2000 + 2200) / 2, "Durham, NC": (1800 + 2000) / 2}
+OLD_MOVING_COSTS = {
+    "Miami, FL": (3220 + 7700) / 2,
+    "Tampa, FL": (2510 + 5700) / 2,
+    "Charleston, SC": (2490 + 5500) / 2,
+    "Durham, NC": (2640 + 5800) / 2,
+}
+
+
+@pytest.fixture
+def shipped_store(tmp_path):
+    for name in (METROS_CSV, OBSERVATIONS_CSV):
+        shutil.copy(f"{DATA_DIR}/{name}", tmp_path / name)
+    return MarketDataStore.open(str(tmp_path))
+
+
+@pytest.fixture
+def small_store(tmp_path):
+    (tmp_path / METROS_CSV).write_text(
+        "metro_id,name,state,lat,lon\n"
+        'a,"A, CA",CA,1,2\n'
+        'b,"B, NC",NC,3,4\n'
+        'c,"C, NC",NC,5,6\n'
+        'd,"D, FL",FL,7,8\n'
+    )
+    #rows deliberately out of metro order; c has no observations at all
+    (tmp_path / OBSERVATIONS_CSV).write_text(
+        "metro_id,field,value,origin_id\n"
+        "d,median_sales_price,400,\n"
+        "b,median_sales_price,200,\n"
+        "a,median_sales_price,100,\n"
+        "d,median_sales_price,600,\n"
+        "b,moving_cost,10,a\n"
+        "d,moving_cost,30,a\n"
+        "b,moving_cost,20,a\n"
+        "d,moving_cost,50,b\n"
+        "b,moving_cost,99,\n"
+    )
+    return MarketDataStore.open(str(tmp_path))
+
+
+def test_summary_matches_old_plot_averages(shipped_store):
+    np.testing.assert_allclose(shipped_store.summary("median_sales_price", list(OLD_PRICES)), list(OLD_PRICES.values()))
+    np.testing.assert_allclose(shipped_store.summary("house_size", list(OLD_HOUSE_SIZES)), list(OLD_HOUSE_SIZES.values()))
+
+
+def test_moving_cost_matrix_matches_old_plot_averages(shipped_store):
+    matrix = shipped_store.moving_cost_matrix(["Sonoma, CA"], list(OLD_MOVING_COSTS))
+    np.testing.assert_allclose(matrix, [list(OLD_MOVING_COSTS.values())])
+
+
+def test_summary_stats_and_metros_without_observations(small_store):
+    metros = ["d", "c", "b", "a", "d"]
+    np.testing.assert_array_equal(small_store.summary("median_sales_price", metros), [500, np.nan, 200, 100, 500])
+    np.testing.assert_array_equal(small_store.summary("median_sales_price", metros, "min"), [400, np.nan, 200, 100, 400])
+    np.testing.assert_array_equal(small_store.summary("median_sales_price", metros, "max"), [600, np.nan, 200, 100, 600])
+    np.testing.assert_array_equal(small_store.summary("median_sales_price", metros, "count"), [2, 0, 1, 1, 2])
+    assert [list(values) for values in small_store.observations("median_sales_price", ["c", "d"])] == [[], [400, 600]]
+
+
+def test_moving_cost_matrix_remaps_origins(small_store):
+    #quotes from origins outside the request (and without an origin) are ignored
+    matrix = small_store.moving_cost_matrix(["b", "a", "c"], ["d", "c", "b"])
+    np.testing.assert_array_equal(matrix, [[50, np.nan, np.nan], [30, np.nan, 15], [np.nan, np.nan, np.nan]])
+    counts = small_store.moving_cost_matrix(["a"], ["b", "d"], "count")
+    np.testing.assert_array_equal(counts, [[2, 1]])
+    np.testing.assert_array_equal(small_store.moving_cost_matrix(["a"], ["b"], "max"), [[20]])
+
+
+def test_unknown_metros_raise(small_store):
+    with pytest.raises(KeyError, match="Unknown metro 'nowhere-tx'"):
+        small_store.summary("median_sales_price", ["a", "Nowhere, TX"])
+    with pytest.raises(KeyError, match="Unknown metro"):
+        small_store.moving_cost_matrix(["zz"], ["a"])
+    with pytest.raises(ValueError, match="stat must be one of"):
+        small_store.summary("median_sales_price", ["a"], "median")
+    assert "a" in small_store and "Nowhere, TX" not in small_store
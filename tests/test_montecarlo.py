@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from montecarlo import PERCENTILES, simulate_relocation_costs
+from relocation import relocation_costs
+
+
+class RangeStore:
+    """Minimal stand-in for MarketDataStore with fixed observation ranges."""
+
+    def __init__(self, origin, prices, moving):
+        self.origin, self.prices, self.moving = origin, prices, moving
+
+    def summary(self, field, metros, stat):
+        ranges = [self.origin] if metros == ["origin"] else [self.prices.get(metro, (np.nan, np.nan)) for metro in metros]
+        return np.array([low if stat == "min" else high for low, high in ranges], dtype=float)
+
+    def moving_cost_matrix(self, origins, destinations, stat):
+        ranges = [self.moving.get(metro, (np.nan, np.nan)) for metro in destinations]
+        return np.array([[low if stat == "min" else high for low, high in ranges]], dtype=float)
+
+    def coordinates(self, metros):
+        return np.zeros((len(metros), 2))
+
+    def display_names(self, metros):
+        return list(metros)
+
+
+def test_histogram_percentiles_match_exact_percentiles():
+    store = RangeStore(
+        origin=(800_000, 1_000_000),
+        prices={"wide": (300_000, 600_000), "narrow": (450_000, 460_000)},
+        moving={"wide": (2_000, 8_000), "narrow": (4_000, 4_500)},
+    )
+    draws, seed = 200_000, 7
+    table = simulate_relocation_costs(store, "origin", ["wide", "narrow"], draws=draws, chunk_size=draws, seed=seed)
+
+    #the same draws, evaluated exactly (the simulation samples origin, destination and moving in this order)
+    rng = np.random.default_rng(seed)
+    origin = 800_000 + rng.random((draws, 1), dtype=np.float32) * np.float32(200_000)
+    dest = np.float32([300_000, 450_000]) + rng.random((draws, 2), dtype=np.float32) * np.float32([300_000, 10_000])
+    moving = np.float32([2_000, 4_000]) + rng.random((draws, 2), dtype=np.float32) * np.float32([6_000, 500])
+    costs = relocation_costs(origin, dest, moving)
+
+    for name, column in (("wide", 0), ("narrow", 1)):
+        row = table.set_index("name").loc[name]
+        width = costs[:, column].max() - costs[:, column].min()
+        for p in PERCENTILES:
+            #within one histogram bin of the exact percentile
+            assert abs(row[f"p{p}"] - np.percentile(costs[:, column], p)) < width / 1024
+        assert row["mean"] == pytest.approx(costs[:, column].mean(), rel=1e-6)
+
+
+def test_zero_width_ranges_and_missing_destinations():
+    store = RangeStore(
+        origin=(900_000, 900_000),
+        prices={"fixed": (500_000, 500_000), "no-quote": (400_000, 420_000)},
+        moving={"fixed": (4_000, 4_000)},
+    )
+    table = simulate_relocation_costs(store, "origin", ["fixed", "no-quote", "unknown"], draws=1_000, seed=1)
+    expected = relocation_costs(900_000, 500_000, 4_000)
+    assert list(table["name"]) == ["fixed"]
+    for p in PERCENTILES:
+        assert table.loc[0, f"p{p}"] == pytest.approx(expected)
+    assert table.loc[0, "spread"] == pytest.approx(0)
+    assert table.attrs["missing"] == ["no-quote", "unknown"]
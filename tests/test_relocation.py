@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from relocation import relocation_cost_matrix, relocation_costs
+from tools import calculate_relocation_costs
+
+ORIGINS = [894854.25, 1300000.0]
+DESTS = [513750.0, 422111.0, 436542.67]
+MOVING = [[4220.0, 4340.0, 4105.0], [10950.0, 9800.0, 10100.0]]
+
+
+def test_cells_match_the_scalar_tool():
+    matrix = relocation_cost_matrix(ORIGINS, DESTS, MOVING)
+    assert matrix.shape == (2, 3)
+    for i, origin in enumerate(ORIGINS):
+        for j, dest in enumerate(DESTS):
+            assert matrix[i, j] == calculate_relocation_costs(origin, dest, MOVING[i][j])
+
+
+def test_per_origin_fees_only_change_their_row():
+    base = relocation_cost_matrix(ORIGINS, DESTS, MOVING)
+    changed = relocation_cost_matrix(
+        ORIGINS, DESTS, MOVING,
+        prep_cost=[10000.0, 25000.0],
+        percent_sale_comission=[0.05, 0.06],
+        payoff_loan_amount=[100000.0, 0.0],
+    )
+    np.testing.assert_array_equal(changed[0], base[0])
+    expected = relocation_costs(1300000.0, np.array(DESTS), np.array(MOVING[1]), prep_cost=25000.0,
+                                percent_sale_comission=0.06, payoff_loan_amount=0.0)
+    np.testing.assert_allclose(changed[1], np.round(expected, 2))
+    assert np.all(changed[1] != base[1])
+
+
+def test_moving_costs_broadcast():
+    row = relocation_cost_matrix(ORIGINS, DESTS, MOVING[0])
+    np.testing.assert_array_equal(row, relocation_cost_matrix(ORIGINS, DESTS, [MOVING[0], MOVING[0]]))
+    scalar = relocation_cost_matrix(ORIGINS, DESTS, 5000.0, decimals=None)
+    assert scalar.shape == (2, 3)
+    assert scalar[1, 2] == pytest.approx(relocation_costs(1300000.0, 436542.67, 5000.0))
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"moving_costs": [[1.0, 2.0], [3.0, 4.0]]}, r"moving_costs must broadcast to \(2, 3\)"),
+    ({"moving_costs": [1.0, 2.0]}, r"moving_costs must broadcast to \(2, 3\)"),
+    ({"prep_cost": [1.0, 2.0, 3.0]}, r"prep_cost must be a scalar or have one entry per origin \(2\)"),
+    ({"percent_closing_cost": [[0.02, 0.02]]}, "percent_closing_cost must be a scalar"),
+])
+def test_wrong_shapes_raise(kwargs, message):
+    arguments = {"origin_prices": ORIGINS, "dest_prices": DESTS, "moving_costs": MOVING, **kwargs}
+    with pytest.raises(ValueError, match=message):
+        relocation_cost_matrix(**arguments)
@@ -0,0 +1,94 @@
+import sys
+import threading
+import time
+import types
+
+import plotly.graph_objects as go
+import pytest
+
+import render
+from render import MapRenderer, point_count, prepare_figure
+
+
+def _geo_figure(n, mode="markers+text"):
+    return go.Figure(go.Scattergeo(
+        lat=[i % 80 for i in range(n)],
+        lon=[i % 170 for i in range(n)],
+        text=[f"town {i}" for i in range(n)],
+        mode=mode,
+    ))
+
+
+def test_small_figures_come_back_unchanged():
+    fig = _geo_figure(10)
+    assert prepare_figure(fig, webgl_threshold=10) is fig
+
+
+def test_large_figures_switch_to_webgl_and_hover_text():
+    fig = _geo_figure(50)
+    converted = prepare_figure(fig, webgl_threshold=10)
+    [trace] = converted.data
+    assert trace.type == "scattermap"
+    assert trace.mode == "markers"
+    assert list(trace.hovertext) == [f"town {i}" for i in range(50)]
+    assert point_count(converted) == 50
+    assert converted.layout.map.style == "carto-positron"
+    #the original figure is left alone
+    assert fig.data[0].type == "scattergeo" and fig.data[0].mode == "markers+text"
+
+
+def test_large_scatter_becomes_scattergl_and_keeps_hover_text():
+    fig = go.Figure(go.Scatter(x=list(range(20)), y=list(range(20)), text=["a"] * 20, hovertext=["h"] * 20,
+                               mode="markers+text"))
+    [trace] = prepare_figure(fig, webgl_threshold=5).data
+    assert (trace.type, trace.mode, list(trace.hovertext)) == ("scattergl", "markers", ["h"] * 20)
+
+
+@pytest.fixture
+def fake_kaleido(monkeypatch):
+    calls = []
+    kaleido = types.SimpleNamespace(
+        start_sync_server=lambda **kwargs: calls.append("start"),
+        stop_sync_server=lambda **kwargs: calls.append("stop"),
+    )
+    monkeypatch.setitem(sys.modules, "kaleido", kaleido)
+    monkeypatch.setattr(render, "_server_owner", None)
+    return calls
+
+
+def test_only_the_starting_renderer_stops_the_server(fake_kaleido):
+    first, second = MapRenderer().start(), MapRenderer().start()
+    second.close()
+    assert fake_kaleido == ["start"]
+    first.close()
+    assert fake_kaleido == ["start", "stop"]
+    #the server is restarted by whichever renderer exports next
+    second.start()
+    second.close()
+    assert fake_kaleido == ["start", "stop", "start", "stop"]
+
+
+def test_exports_do_not_overlap(fake_kaleido, monkeypatch):
+    active, overlaps = [], []
+
+    def write_images(figs, paths, **options):
+        active.append(paths)
+        if len(active) > 1:
+            overlaps.append(list(active))
+        time.sleep(0.02)
+        active.remove(paths)
+
+    monkeypatch.setattr(render.pio, "write_images", write_images, raising=False)
+    renderers = [MapRenderer(), MapRenderer()]
+    threads = [
+        threading.Thread(target=renderer.export, args=([_geo_figure(3)], [f"{i}.png"]))
+        for i, renderer in enumerate(renderers * 3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
+    assert fake_kaleido == ["start"]
+    for renderer in renderers:
+        renderer.close()
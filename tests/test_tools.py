@@ -0,0 +1,24 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tools
+
+
+def test_concurrent_first_loads_open_the_store_once(monkeypatch):
+    opened = []
+
+    def slow_open():
+        opened.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(tools.MarketDataStore, "open", slow_open)
+    tools._market_data.cache_clear()
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            stores = list(pool.map(lambda _: tools.get_market_data(), range(4)))
+    finally:
+        tools._market_data.cache_clear()
+    assert len(opened) == 1
+    assert all(store is stores[0] for store in stores)
@@ -0,0 +1,41 @@
+from smolagents import CodeAgent
+
+from bench import StubModel
+from tools import calculate_relocation_cost_matrix
+from tracing import Tracer
+
+
+def _run(actions, planning_interval=None):
+    tracer = Tracer(path=None)
+    agent = CodeAgent(
+        model=StubModel(actions),
+        tools=[tracer.traced_tool(calculate_relocation_cost_matrix)],
+        step_callbacks=tracer.step_callbacks(),
+        planning_interval=planning_interval,
+        verbosity_level=0,
+        max_steps=len(actions) + 1,
+    )
+    tracer.instrument(agent)
+    with tracer.run("task"):
+        agent.run("task")
+    return tracer.records
+
+
+def test_planning_steps_are_traced():
+    records = _run(["final_answer(1)"], planning_interval=1)
+    step_types = [record["step_type"] for record in records if record["kind"] == "step"]
+    assert step_types == ["PlanningStep", "ActionStep"]
+    run = records[-1]
+    assert run["kind"] == "run" and run["steps"] == 2
+
+
+def test_retries_and_repeated_tool_calls_are_counted():
+    call = "print(calculate_relocation_cost_matrix([900000.0], [500000.0], [[4000.0]]))"
+    records = _run(["undefined_name", "undefined_name", call, call, "final_answer(1)"])
+    steps = [record for record in records if record["kind"] == "step"]
+    assert [step["retry"] for step in steps] == [0, 1, 2, 0, 0]
+    assert [bool(step["error"]) for step in steps] == [True, True, False, False, False]
+    assert [record["repeat"] for record in records if record["kind"] == "tool"] == [0, 1]
+    run = records[-1]
+    assert (run["errors"], run["step_retries"], run["tool_repeats"], run["tool_calls"]) == (2, 2, 1, 2)
+    assert {record["run_id"] for record in records} == {run["run_id"]}
@@ -0,0 +1,219 @@
+import threading
+from functools import lru_cache
+
+from smolagents import tool
+
+from relocation import relocation_costs, relocation_cost_matrix
+from market_data import MarketDataStore
+from gazetteer import Gazetteer
+from render import get_renderer
+from montecarlo import simulate_relocation_costs
+
+
+#local data sets are loaded on first use and then stay warm for the life of the process;
+#lru_cache alone lets concurrent first queries both load (and rebuild the store files under each other)
+_load_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _market_data():
+    return MarketDataStore.open()
+
+
+@lru_cache(maxsize=None)
+def _places():
+    return Gazetteer.load()
+
+
+def get_market_data():
+    with _load_lock:
+        return _market_data()
+
+
+def get_places():
+    with _load_lock:
+        return _places()
+
+
+@tool
+def calculate_relocation_costs(
+    median_sales_price_origin: float,
+    median_sales_price_dest: float,
+    estimated_moving_costs: float,  # Average speed for cargo planes
+) -> float:
+    """
+    Calculate relocation costs from a given location to new destination.  
+
+    Args:
+        median_sales_price_origin: sales price of current home
+        median_sales_price_dest: sales price at new location or destination. 
+        estimated_moving_costs: estimated moving costs for average sized house at median price
+
+    Returns:
+        float: The total relocation cost 
+
+    Example:
+        >>> # median sales price in San Francisco is $1,300,000, median sales price in Chapel Hill is $530,000,
+        >>> estimated_moving_costs (full service) are $10,950, and payoff loan amount is $100,000
+        >>> result = calculate_relocation_cost(1300000.00, 530000.00, 10950.00, 100000.000)
+    """
+
+    reloc_cost = relocation_costs(median_sales_price_origin, median_sales_price_dest, estimated_moving_costs)
+    return round(float(reloc_cost), 2)
+
+@tool
+def calculate_relocation_cost_matrix(
+    origin_prices: list,
+    dest_prices: list,
+    moving_costs: list,
+    prep_costs: list = None,
+    percent_sale_comissions: list = None,
+    percent_closing_costs: list = None,
+    payoff_loan_amounts: list = None,
+) -> list:
+    """
+    Calculate relocation costs for every origin and destination pair in a single call.
+    Use this instead of calling calculate_relocation_costs once per city.
+
+    Args:
+        origin_prices: median sales prices of the current homes, one per origin
+        dest_prices: median sales prices at the destinations, one per destination
+        moving_costs: moving costs, either one per destination or one list per origin (a matrix)
+        prep_costs: optional home preparation cost per origin (default 10000)
+        percent_sale_comissions: optional sale comission fraction per origin (default 0.05)
+        percent_closing_costs: optional closing cost fraction per origin (default 0.02)
+        payoff_loan_amounts: optional loan payoff amount per origin (default 100000)
+
+    Returns:
+        list: relocation costs as a list of rows, one row per origin with one cost per destination
+
+    Example:
+        >>> costs = calculate_relocation_cost_matrix([1300000.00], [530000.00, 610000.00], [10950.00, 9800.00])
+        >>> costs[0][1]  # San Francisco -> second destination
+    """
+    fees = {
+        "prep_cost": prep_costs,
+        "percent_sale_comission": percent_sale_comissions,
+        "percent_closing_cost": percent_closing_costs,
+        "payoff_loan_amount": payoff_loan_amounts,
+    }
+    costs = relocation_cost_matrix(
+        origin_prices,
+        dest_prices,
+        moving_costs,
+        **{name: value for name, value in fees.items() if value is not None},
+    )
+    return costs.tolist()
+
+@tool
+def calculate_relocation_costs_from_market_data(origin: str, destinations: list) -> dict:
+    """
+    Calculate relocation costs using the local market data store (median sales prices and full-service
+    moving quotes), without searching the web. Metros missing from the store are reported as None,
+    research those with the web_agent instead.
+
+    Args:
+        origin: origin metro, e.g. "Sonoma, CA"
+        destinations: destination metros, e.g. ["Durham, NC", "Madison, WI"]
+
+    Returns:
+        dict: relocation cost per destination, None where the store has no data for the pair
+    """
+    market_data = get_market_data()
+    known = [dest for dest in destinations if dest in market_data]
+    if origin not in market_data or not known:
+        return {dest: None for dest in destinations}
+    costs = relocation_cost_matrix(
+        market_data.summary("median_sales_price", [origin]),
+        market_data.summary("median_sales_price", known),
+        market_data.moving_cost_matrix([origin], known),
+    )[0]
+    costs = {dest: (None if cost != cost else float(cost)) for dest, cost in zip(known, costs)}
+    return {dest: costs.get(dest) for dest in destinations}
+
+@tool
+def find_candidate_towns(
+    lat: float,
+    lon: float,
+    radius_km: float = None,
+    k: int = None,
+    state: str = None,
+) -> list:
+    """
+    Find candidate destination towns around a coordinate from the local US gazetteer, no web search needed.
+    Give radius_km for every town within that distance, k for the k nearest towns, or only state for every town in the state.
+
+    Args:
+        lat: latitude of the search center, e.g. 35.5951
+        lon: longitude of the search center (negative for west), e.g. -82.5515
+        radius_km: optional search radius in kilometers
+        k: optional number of nearest towns to return
+        state: optional two letter state code to restrict the search to, e.g. "NC"
+
+    Returns:
+        list: towns as dicts with name ("Asheville, NC"), state, lat, lon and distance_km, nearest first
+    """
+    places = get_places()
+    if radius_km is not None:
+        towns = places.within_radius(lat, lon, radius_km, state=state)
+        if k is not None:
+            towns = towns.head(k)
+    elif k is not None:
+        towns = places.nearest(lat, lon, k=k, state=state)
+    elif state is not None:
+        towns = places.in_state(state)
+    else:
+        raise ValueError("Give at least one of radius_km, k or state")
+    return towns.to_dict("records")
+
+@tool
+def geocode_places(names: list) -> dict:
+    """
+    Look up coordinates of US places in the local gazetteer.
+
+    Args:
+        names: places formatted as "Name, ST", e.g. ["Durham, NC", "Sonoma, CA"]
+
+    Returns:
+        dict: place -> (lat, lon), or None when the place is not in the gazetteer (search the web for those)
+    """
+    return get_places().geocode(names)
+
+@tool
+def save_maps(figures: list, paths: list) -> list:
+    """
+    Save plotly map figures as images in one pass with a warm renderer. Much faster than fig.write_image,
+    and large maps are switched to WebGL automatically.
+
+    Args:
+        figures: plotly figures to save, e.g. [fig]
+        paths: image file paths, one per figure, e.g. ["saved_map.png"]
+
+    Returns:
+        list: the saved file paths
+    """
+    return get_renderer().export(figures, paths)
+
+
+@tool
+def simulate_relocation_cost_ranges(origin: str, destinations: list, draws: int = 100000) -> list:
+    """
+    Simulate how uncertain the relocation costs are, using every observed price and moving quote in the local
+    market data store instead of single averages. Use the results to color a map by median cost (p50) and
+    size the points by spread.
+
+    Args:
+        origin: origin metro, e.g. "Sonoma, CA"
+        destinations: destination metros, e.g. ["Durham, NC", "Madison, WI"]
+        draws: number of simulated draws
+
+    Returns:
+        list: one dict per destination, cheapest median first, with name, lat, lon, mean, p5, p25, p50, p75, p95,
+        spread, p_cheapest, p_top_3, modal_rank and rank_stability. Destinations without data are left out.
+    """
+    market_data = get_market_data()
+    known = [dest for dest in destinations if dest in market_data]
+    if origin not in market_data or not known:
+        return []
+    return simulate_relocation_costs(market_data, origin, known, draws=draws).to_dict("records")
+
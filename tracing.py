@@ -0,0 +1,260 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from smolagents import MultiStepAgent, Tool
+from smolagents.memory import ActionStep, PlanningStep
+
+#traces go to their own JSONL file, one record per line; set RELOC_TRACE=0 to turn tracing off
+TRACE_PATH = os.environ.get("RELOC_TRACE", "traces.jsonl")
+
+_run_id = contextvars.ContextVar("reloc_run_id", default=None)
+
+
+def current_run_id():
+    return _run_id.get()
+
+
+def _duration(step):
+    timing = getattr(step, "timing", None)
+    if timing is not None:
+        return getattr(timing, "duration", None)
+    start, end = getattr(step, "start_time", None), getattr(step, "end_time", None)
+    return getattr(step, "duration", None) or (end - start if start and end else None)
+
+
+def _tokens(step, agent):
+    usage = getattr(step, "token_usage", None)
+    if usage is not None:
+        return usage.input_tokens, usage.output_tokens
+    #older smolagents only keep the counts of the last call on the model
+    model = getattr(agent, "model", None)
+    return getattr(model, "last_input_token_count", None), getattr(model, "last_output_token_count", None)
+
+
+class _RunBound:
+    """Calls function with the run ID context variable set; smolagents calls tools on threads without it."""
+
+    def __init__(self, function, run_id):
+        self.function = function
+        self.run_id = run_id
+
+    def __call__(self, *args, **kwargs):
+        token = _run_id.set(self.run_id)
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            _run_id.reset(token)
+
+
+class _RunBoundExecutor:
+    """
+    A CodeAgent python executor whose tools (and managed agents) run under the caller's run ID.
+    The executor evaluates code on its own timeout thread, where the context variable is unset.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def __getattr__(self, name):
+        return getattr(self.executor, name)
+
+    def __call__(self, *args, **kwargs):
+        run_id = current_run_id()
+        tools = self.executor.static_tools
+        for name, tool in list(tools.items()):
+            tool = tool.function if isinstance(tool, _RunBound) else tool
+            if isinstance(tool, (Tool, MultiStepAgent)):
+                tools[name] = _RunBound(tool, run_id)
+        return self.executor(*args, **kwargs)
+
+
+class Tracer:
+    """
+    Records per-step and per-tool timings, token counts and errors of agent runs as JSONL.
+
+    Pass step_callbacks() as the agents' step_callbacks, instrument the agents, wrap tools with
+    traced_tool and checks with traced, and run tasks inside tracer.run(...) so every record carries the run ID.
+    Records are appended to path, or kept in self.records when path is None.
+
+    Record kinds: "step" (agent steps incl. planning), "tool", "check" and "run" (one summary per run).
+    Step records carry "retry", the number of failed steps of that agent right before it, and tool records
+    carry "repeat", the number of identical earlier calls (same tool and arguments) in the run.
+    """
+
+    def __init__(self, path=TRACE_PATH):
+        self.path = path
+        self.records = []
+        self._lock = threading.Lock()
+        self._runs = {}
+        #per run: consecutive failed steps per agent and call counts per (tool, arguments)
+        self._attempts = {}
+
+    @classmethod
+    def from_env(cls):
+        return None if TRACE_PATH in ("", "0") else cls(TRACE_PATH)
+
+    def emit(self, record):
+        record = {"time": time.time(), "run_id": current_run_id(), **record}
+        run = self._runs.get(record["run_id"])
+        with self._lock:
+            if run is not None:
+                run["input_tokens"] += record.get("input_tokens") or 0
+                run["output_tokens"] += record.get("output_tokens") or 0
+                run["steps"] += record["kind"] == "step"
+                run["tool_calls"] += record["kind"] == "tool"
+                run["errors"] += bool(record.get("error"))
+                run["step_retries"] += bool(record.get("retry"))
+                run["tool_repeats"] += bool(record.get("repeat"))
+            if self.path is None:
+                self.records.append(record)
+            else:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    @contextmanager
+    def run(self, task, **fields):
+        """Trace everything inside the block as one run and emit a "run" summary record at the end."""
+        run_id = uuid.uuid4().hex[:12]
+        token = _run_id.set(run_id)
+        summary = self._runs[run_id] = {
+            "input_tokens": 0, "output_tokens": 0, "steps": 0, "tool_calls": 0, "errors": 0,
+            "step_retries": 0, "tool_repeats": 0,
+        }
+        self._attempts[run_id] = {}
+        started = time.perf_counter()
+        error = None
+        try:
+            yield run_id
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.emit({
+                "kind": "run",
+                "task": task[:200],
+                "duration": round(time.perf_counter() - started, 4),
+                "error": error,
+                **summary,
+                **fields,
+            })
+            del self._runs[run_id], self._attempts[run_id]
+            _run_id.reset(token)
+
+    def _count(self, key, failed=None):
+        """
+        Attempts seen before this one under key in the current run. With failed set, counts consecutive
+        failures (reset by a success); without it, counts every earlier attempt.
+        """
+        attempts = self._attempts.get(current_run_id())
+        if attempts is None:
+            return None
+        with self._lock:
+            before = attempts.get(key, 0)
+            attempts[key] = 0 if failed is False else before + 1
+        return before
+
+    def instrument(self, agent):
+        """
+        Carry the run ID into the threads the agent calls tools on (the CodeAgent executor's timeout thread,
+        parallel ToolCallingAgent calls), so tool records and managed agents' steps land in the right run.
+        """
+        if hasattr(agent, "python_executor"):
+            agent.python_executor = _RunBoundExecutor(agent.python_executor)
+        elif hasattr(agent, "process_tool_calls"):
+            process_tool_calls, execute_tool_call = agent.process_tool_calls, agent.execute_tool_call
+
+            def bound_process_tool_calls(*args, **kwargs):
+                agent.execute_tool_call = _RunBound(execute_tool_call, current_run_id())
+                return process_tool_calls(*args, **kwargs)
+
+            agent.process_tool_calls = bound_process_tool_calls
+        return agent
+
+    def step_callbacks(self):
+        """step_callbacks for an agent: a plain list would only register ActionStep, leaving out planning."""
+        return {ActionStep: self.step_callback, PlanningStep: self.step_callback}
+
+    def step_callback(self, memory_step, agent=None):
+        """smolagents step callback, records ActionStep and PlanningStep timings and token usage."""
+        input_tokens, output_tokens = _tokens(memory_step, agent)
+        error = getattr(memory_step, "error", None)
+        tool_calls = getattr(memory_step, "tool_calls", None) or []
+        retry = None
+        if isinstance(memory_step, ActionStep):
+            retry = self._count(("step", id(agent)), failed=bool(error))
+        self.emit({
+            "kind": "step",
+            "agent": getattr(agent, "name", None) or type(agent).__name__,
+            "step_type": type(memory_step).__name__,
+            "step": getattr(memory_step, "step_number", None),
+            "duration": _duration(memory_step),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "tools": [call.name for call in tool_calls],
+            #a failed step is retried by the agent on the next step
+            "error": str(error) if error else None,
+            "retry": retry,
+        })
+
+    def traced(self, function, kind="check"):
+        """Wrap a plain function (e.g. a final answer check) so each call is recorded."""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = None
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                self.emit({
+                    "kind": kind,
+                    "name": function.__name__,
+                    "duration": round(time.perf_counter() - started, 4),
+                    "error": error,
+                })
+        return wrapper
+
+    def traced_tool(self, tool):
+        return TracedTool(tool, self)
+
+
+class TracedTool(Tool):
+    """Wraps a smolagents tool so each call's wall time and error are recorded by a Tracer."""
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool, tracer):
+        self.tool = tool
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        self.tracer = tracer
+        super().__init__()
+
+    def forward(self, *args, **kwargs):
+        kwargs.update(zip(self.inputs, args))
+        repeat = self.tracer._count(("tool", self.name, json.dumps(kwargs, sort_keys=True, default=str)))
+        started = time.perf_counter()
+        error = None
+        try:
+            return self.tool(**kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.tracer.emit({
+                "kind": "tool",
+                "tool": self.name,
+                "repeat": repeat,
+                "duration": round(time.perf_counter() - started, 4),
+                "error": error,
+            })